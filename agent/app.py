@@ -1,24 +1,53 @@
 from typing import List, Dict, Any, Tuple
+import asyncio
+import time
+import uuid
 import anthropic
 import yaml
 import os 
 from dotenv import load_dotenv
 from backend.app.services.medical_api import get_symptoms, get_specialisations
+from backend.app.services.doctolib import map_specialisations
+from backend.app.core.tracing import span, traced
+from backend.app.core.usage import usage_tracker
 
 from agent.services import MedicalService
-from agent.tools import Tool
+from agent.tools import Tool, PrefetchBuffer
 
 
 class MedicalAssistantLLM:
-    def __init__(self, anthropic_api_key: str, prompt_path: str = "prompt.yaml"):
+    MODEL = "claude-3-5-sonnet-20241022"
+
+    def __init__(
+        self,
+        anthropic_api_key: str,
+        prompt_path: str = "prompt.yaml",
+        max_tool_steps: int = 8,
+        prefetch_top_specialisations: int = 3,
+        client: Any = None,
+        service: MedicalService = None,
+        session_id: str = None
+    ):
         """
         Initialize the Medical Assistant LLM component
+
+        Args:
+            max_tool_steps: Maximum number of model calls per user message
+            prefetch_top_specialisations: Number of top-ranked specialisations whose
+                doctors are fetched speculatively after get_specializations
+            client: Anthropic client to use instead of a new AsyncAnthropic
+            service: MedicalService to use instead of the default one
+            session_id: Key of this conversation in the usage accounting
         """
-        self.client = anthropic.Client(api_key=anthropic_api_key)
-        self.service = MedicalService()
-        self.MODEL = "claude-3-5-sonnet-20241022"
+        self.client = client or anthropic.AsyncAnthropic(api_key=anthropic_api_key)
+        self.service = service or MedicalService()
+        self.tools = Tool.bind(self.service)
         self.conversation_history = []
         self.system_prompt = self._load_system_prompt(prompt_path)
+        self.max_tool_steps = max_tool_steps
+        self.prefetch_top_specialisations = prefetch_top_specialisations
+        self.prefetch = PrefetchBuffer()
+        self.session_id = session_id or uuid.uuid4().hex
 
     def _load_system_prompt(self, prompt_path: str) -> str:
         """
@@ -51,100 +80,199 @@ class MedicalAssistantLLM:
                 - result: Tool execution result or error message
                 - is_error: True if an error occurred, False otherwise
         """
-        try:
-            if tool_name == "get_symptoms":
-                result = await self.service.get_symptoms()
-                return result, False
-                
-            elif tool_name == "get_specializations":
-                result = await self.service.get_specializations(**tool_args)
+        with span("agent.execute_tool", tool=tool_name) as tool_span:
+            try:
+                if tool_name == "get_doctors":
+                    hit, result = await self.prefetch.take(tool_name, tool_args)
+                    tool_span.set_attribute("prefetch_hit", hit)
+                    if hit:
+                        return result, False
+
+                tool = self.tools.get(tool_name)
+                if tool is None:
+                    return {
+                        "error": f"Unknown tool: {tool_name}"
+                    }, True
+
+                result = await tool(**tool_args)
                 return result, False
                 
-            else:
+            except Exception as e:
+                tool_span.error = f"{type(e).__name__}: {e}"
                 return {
-                    "error": f"Unknown tool: {tool_name}"
+                    "error": f"Tool execution failed: {str(e)}"
                 }, True
-                
-        except Exception as e:
-            return {
-                "error": f"Tool execution failed: {str(e)}"
-            }, True
 
+    def _prefetch_doctors(self, specialisations: List[Dict]):
+        """
+        Speculatively fetch doctors for the top-ranked specialisations so that
+        the model's likely get_doctors calls are served from the prefetch buffer.
+        """
+        ranked = sorted(
+            specialisations,
+            key=lambda specialisation: specialisation.get("Accuracy", 0),
+            reverse=True
+        )
+        specialties = map_specialisations(
+            [specialisation.get("Name", "") for specialisation in ranked]
+        )
+        for specialty in specialties[:self.prefetch_top_specialisations]:
+            self.prefetch.schedule(
+                "get_doctors",
+                {"specialty": specialty},
+                lambda specialty=specialty: self.service.get_doctors(specialty)
+            )
+
+    @traced("agent.handle_tool_calls")
     async def _handle_tool_calls(
         self, 
-        tool_calls: List[Dict]
+        tool_calls: List[Any]
     ) -> List[Dict[str, Any]]:
         """
         Handle multiple tool calls and collect their results.
         
         Args:
-            tool_calls: List of tool calls from Claude's response
+            tool_calls: List of tool_use blocks from Claude's response
             
         Returns:
-            List[Dict]: List of tool results to be added to conversation history
+            List[Dict]: tool_result blocks, to be sent back in a single user message
         """
+        results = await asyncio.gather(*[
+            self._execute_tool(tool_call.name, tool_call.input)
+            for tool_call in tool_calls
+        ])
+
         tool_results = []
-        
-        for tool_call in tool_calls:
-            # Execute the tool
-            result, is_error = await self._execute_tool(
-                tool_call.function.name,
-                tool_call.function.arguments
-            )
-            
+        for tool_call, (result, is_error) in zip(tool_calls, results):
+            if tool_call.name == "get_specializations" and not is_error:
+                self._prefetch_doctors(result)
+
             # Format the tool result
             tool_results.append({
-                "role": "user",
-                "content": [{
-                    "type": "tool_result",
-                    "tool_use_id": tool_call.id,
-                    "content": str(result),
-                    "is_error": is_error
-                }]
+                "type": "tool_result",
+                "tool_use_id": tool_call.id,
+                "content": str(result),
+                "is_error": is_error
             })
             
         return tool_results
     
-    async def process_message(self, user_input: str) -> str:
+    async def process_message(self, user_input: str, raise_errors: bool = False) -> str:
         """
-        Process a single user message and return assistant's response
+        Process a single user message and return assistant's response.
+
+        Tool results are sent back to Claude until it answers without
+        requesting a tool, or until max_tool_steps model calls were made.
+        Errors are returned as the response unless raise_errors is set.
         """
         try:
+            with span("agent.process_message") as turn_span:
+                return await self._run_turn(user_input, turn_span)
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Detailed error: {str(e)}")  
+            return f"Error processing message: {str(e)}"
+
+    async def _call_model(
+        self,
+        messages: List[Dict],
+        tools: List[Dict],
+        turn: Dict[str, Any]
+    ) -> Any:
+        """Stream one model call, recording its usage, latency and time to first token"""
+        start = time.perf_counter()
+        ttft = None
+        async with self.client.messages.stream(
+            model=self.MODEL,
+            max_tokens=1024,
+            system=self.system_prompt,  # Pass the prompt string directly
+            messages=messages,
+            tools=tools,
+            tool_choice={"type": "auto"},
+        ) as stream:
+            async for event in stream:
+                if ttft is None and event.type == "content_block_start":
+                    ttft = time.perf_counter() - start
+            response = await stream.get_final_message()
+
+        usage_tracker.record_call(
+            turn, response.usage, self.system_prompt, tools, messages,
+            time.perf_counter() - start, ttft
+        )
+        return response
+
+    async def _run_turn(self, user_input: str, turn_span) -> str:
+        """Run the tool loop for one user message and update the history"""
+        turn = usage_tracker.start_turn(self.session_id)
+        try:
+            return await self._run_steps(user_input, turn_span, turn)
+        finally:
+            # A SQLite write: kept off the event loop.
+            await asyncio.to_thread(usage_tracker.finish_turn, self.session_id, turn)
+
+    async def _run_steps(self, user_input: str, turn_span, turn: Dict[str, Any]) -> str:
+        """Call the model and execute tools until it answers or max_tool_steps is hit"""
+        with span("agent.build_messages"):
+            messages = [
+                *self.conversation_history,
+                {
+                    "role": "user",
+                    "content": user_input
+                }
+            ]
+            tools = Tool.get_all_tools()
+
+        for step in range(self.max_tool_steps):
+            turn_span.set_attribute("steps", step + 1)
             # Get response from Claude
-            response = self.client.messages.create(
-                model=self.MODEL,
-                max_tokens=1024,
-                system=self.system_prompt,  # Pass the prompt string directly
-                messages=[
-                    *self.conversation_history,
-                    {
-                        "role": "user",
-                        "content": user_input
-                    }
-                ],
-                tools=Tool.get_all_tools(),
-                tool_choice={"type": "auto"},
-            )
+            with span("anthropic.messages.create", step=step):
+                response = await self._call_model(messages, tools, turn)
+            messages.append({
+                "role": "assistant",
+                "content": [block.model_dump(exclude_none=True) for block in response.content]
+            })
 
-            if response.tool_calls:
-                tool_results = await self._handle_tool_calls(response.tool_calls)
-                self.conversation_history.extend(tool_results)
+            tool_calls = [block for block in response.content if block.type == "tool_use"]
+            if response.stop_reason != "tool_use" or not tool_calls:
+                break
 
-            # Update conversation history
-            self.conversation_history.extend([
-                {"role": "user", "content": user_input},
-                {"role": "assistant", "content": response.content[0].text}
-            ])
+            tool_results = await self._handle_tool_calls(tool_calls)
+            messages.append({"role": "user", "content": tool_results})
+        else:
+            # Every step requested tools: answer the pending tool results so
+            # the history stays valid for the next user message.
+            messages.append({
+                "role": "assistant",
+                "content": "I could not complete this request within the allowed number of steps."
+            })
+            self.conversation_history = messages
+            return messages[-1]["content"]
 
-            return response.content[0].text
+        # Update conversation history
+        self.conversation_history = messages
 
-        except Exception as e:
-            print(f"Detailed error: {str(e)}")  
-            return f"Error processing message: {str(e)}"
+        return "".join(
+            block.text for block in response.content if block.type == "text"
+        )
+
+    def get_usage_summary(self) -> Dict[str, Any]:
+        """Return token, cache and latency accounting for this session"""
+        return usage_tracker.session_summary(self.session_id)
+
+    def get_tool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-tool call counts, cache hits and latency"""
+        return Tool.get_stats()
+
+    def get_prefetch_stats(self) -> Dict[str, Any]:
+        """Return prefetch hit rate and the tool latency hidden behind model calls"""
+        return self.prefetch.get_stats()
     
     def clear_history(self):
         """Clear the conversation history"""
         self.conversation_history = []
+        self.prefetch.clear()
     
     def get_conversation_history(self) -> List[Dict]:
         """Return the current conversation history"""
@@ -0,0 +1,328 @@
+"""
+Bulk offline triage over a JSONL file of anonymised cases.
+
+Each input line is a case such as
+    {"id": "case-1", "message": "I have had a fever for three days",
+     "symptoms": ["Fever"], "age": 42, "gender": "female"}
+where "message" is required and "id" defaults to the line number.
+
+Results are appended to the output JSONL as soon as each case completes, and
+the output doubles as the checkpoint: re-running the same command skips the
+cases already answered, so a crashed run resumes where it stopped. A case that
+failed is written with an "error" instead of a "response" and is run again on
+the next resume; the last line of a case is its current result.
+
+    python -m agent.batch cases.jsonl results.jsonl --concurrency 8
+    python -m agent.batch cases.jsonl results.jsonl --batches
+
+The default mode drives each case through the full agent tool loop. With
+--batches, cases go through the Anthropic Message Batches API instead
+(cheaper, higher throughput, single turn): structured cases are triaged
+server-side first and the model writes the answer from those results.
+Submitted batch IDs are checkpointed so a resumed run collects them instead
+of resubmitting.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set
+
+import yaml
+from dotenv import load_dotenv
+
+from backend.app.services.triage import triage
+
+from agent.app import MedicalAssistantLLM
+from agent.services import MedicalService
+
+
+PROMPT_PATH = Path(__file__).parent / "prompt.yaml"
+BATCH_CHUNK_SIZE = 1000
+POLL_INTERVAL = 30.0
+
+
+def iter_cases(path: str, completed: Set[str]) -> Iterator[Dict[str, Any]]:
+    """Stream cases from a JSONL file, skipping the ones already completed"""
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            case = json.loads(line)
+            case["id"] = str(case.get("id", line_number))
+            if case["id"] not in completed:
+                yield case
+
+
+def load_completed(output_path: str) -> Set[str]:
+    """Return the IDs of the cases already answered in the output file"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+                case_id = result["id"]
+            except (ValueError, KeyError, TypeError):
+                # A line cut short by a crash; the case will be run again.
+                continue
+            if "error" in result:
+                # A failed case; run it again unless a later line answered it.
+                completed.discard(case_id)
+            else:
+                completed.add(case_id)
+    return completed
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+class ResultWriter:
+    """Appends one JSON line per finished case and flushes it to disk immediately"""
+
+    def __init__(self, output_path: str):
+        self.path = output_path
+        self.completed = load_completed(output_path)
+        self._file = open(output_path, "a", encoding="utf-8")
+        if self._file.tell() and not _ends_with_newline(output_path):
+            # Terminate a line cut short by a crash so it does not swallow the next result.
+            self._file.write("\n")
+        self.written = 0
+        self.failed = 0
+
+    def write(self, result: Dict[str, Any]) -> None:
+        if result["id"] in self.completed:
+            return
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if "error" in result:
+            # Not completed: a resumed run retries the case.
+            self.failed += 1
+        else:
+            self.completed.add(result["id"])
+            self.written += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+async def run_agent_cases(
+    cases: Iterator[Dict[str, Any]],
+    writer: ResultWriter,
+    client: Any,
+    service: MedicalService = None,
+    concurrency: int = 4,
+    prompt_path: Path = PROMPT_PATH
+) -> None:
+    """Run each case through a fresh agent, at most ``concurrency`` at a time"""
+    service = service or MedicalService()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def worker():
+        while True:
+            case = await queue.get()
+            if case is None:
+                return
+            assistant = MedicalAssistantLLM(
+                "", prompt_path=str(prompt_path), client=client, service=service
+            )
+            start = time.perf_counter()
+            result = {"id": case["id"]}
+            try:
+                result["response"] = await assistant.process_message(case["message"], raise_errors=True)
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["latency"] = round(time.perf_counter() - start, 3)
+            writer.write(result)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    for case in cases:
+        await queue.put(case)
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+
+
+class BatchCheckpoint:
+    """Submitted-but-not-collected Message Batches, persisted as JSON"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.batches: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.batches = json.load(file)["batches"]
+
+    def _save(self) -> None:
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"batches": self.batches}, file)
+        os.replace(temporary, self.path)
+
+    def add(self, batch_id: str, case_ids: Dict[str, str]) -> None:
+        self.batches.append({"batch_id": batch_id, "case_ids": case_ids})
+        self._save()
+
+    def remove(self, batch_id: str) -> None:
+        self.batches = [batch for batch in self.batches if batch["batch_id"] != batch_id]
+        self._save()
+
+
+def _custom_id(index: int, case_id: str) -> str:
+    # Batch custom IDs are limited to 64 characters of [a-zA-Z0-9_-].
+    return f"{index}-{re.sub(r'[^a-zA-Z0-9_-]', '_', case_id)}"[:64]
+
+
+async def build_batch_request(case: Dict[str, Any], custom_id: str, model: str, system_prompt: str) -> Dict[str, Any]:
+    """Build one Message Batches request, with server-side triage results if possible"""
+    content = case["message"]
+    if case.get("symptoms") and case.get("age") is not None and case.get("gender"):
+        try:
+            result = await triage(case["symptoms"], case["age"], case["gender"])
+            content += "\n\nTriage results:\n" + json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            content += f"\n\nTriage failed: {e}"
+
+    return {
+        "custom_id": custom_id,
+        "params": {
+            "model": model,
+            "max_tokens": 1024,
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": content}],
+        },
+    }
+
+
+async def collect_batch(client: Any, batch: Dict[str, Any], writer: ResultWriter, poll_interval: float) -> None:
+    """Wait for a Message Batch to end and write its results"""
+    while True:
+        status = await client.messages.batches.retrieve(batch["batch_id"])
+        if status.processing_status == "ended":
+            break
+        await asyncio.sleep(poll_interval)
+
+    async for item in await client.messages.batches.results(batch["batch_id"]):
+        result = {"id": batch["case_ids"][item.custom_id]}
+        if item.result.type == "succeeded":
+            result["response"] = "".join(
+                block.text for block in item.result.message.content if block.type == "text"
+            )
+        elif item.result.type == "errored":
+            result["error"] = str(item.result.error)
+        else:
+            result["error"] = item.result.type
+        writer.write(result)
+
+
+async def run_batch_cases(
+    cases: Iterator[Dict[str, Any]],
+    writer: ResultWriter,
+    client: Any,
+    checkpoint: BatchCheckpoint,
+    model: str,
+    system_prompt: str,
+    concurrency: int = 4,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    poll_interval: float = POLL_INTERVAL
+) -> None:
+    """Submit cases as Message Batches of ``chunk_size`` requests and collect them"""
+    pending_ids = {
+        case_id for batch in checkpoint.batches for case_id in batch["case_ids"].values()
+    }
+    collectors = [
+        asyncio.create_task(collect_batch(client, batch, writer, poll_interval))
+        for batch in checkpoint.batches
+    ]
+
+    async def submit(chunk: List[Dict[str, Any]]) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def build(index: int, case: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await build_batch_request(case, _custom_id(index, case["id"]), model, system_prompt)
+
+        requests = await asyncio.gather(*[build(index, case) for index, case in enumerate(chunk)])
+        created = await client.messages.batches.create(requests=requests)
+        batch = {
+            "batch_id": created.id,
+            "case_ids": {request["custom_id"]: case["id"] for request, case in zip(requests, chunk)},
+        }
+        checkpoint.add(batch["batch_id"], batch["case_ids"])
+        collectors.append(asyncio.create_task(collect_batch(client, batch, writer, poll_interval)))
+
+    chunk = []
+    for case in cases:
+        if case["id"] in pending_ids:
+            continue
+        chunk.append(case)
+        if len(chunk) >= chunk_size:
+            await submit(chunk)
+            chunk = []
+    if chunk:
+        await submit(chunk)
+
+    for collector, batch in zip(collectors, list(checkpoint.batches)):
+        await collector
+        checkpoint.remove(batch["batch_id"])
+
+
+async def run(args) -> None:
+    import anthropic
+
+    load_dotenv()
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+
+    client = anthropic.AsyncAnthropic(api_key=api_key)
+    writer = ResultWriter(args.output)
+    cases = iter_cases(args.cases, writer.completed)
+    try:
+        if args.batches:
+            with open(args.prompt, "r") as file:
+                system_prompt = yaml.safe_load(file)["system_prompt"]
+            await run_batch_cases(
+                cases,
+                writer,
+                client,
+                BatchCheckpoint(f"{args.output}.checkpoint.json"),
+                MedicalAssistantLLM.MODEL,
+                system_prompt,
+                args.concurrency,
+                args.chunk_size,
+                args.poll_interval
+            )
+        else:
+            await run_agent_cases(cases, writer, client, concurrency=args.concurrency, prompt_path=args.prompt)
+    finally:
+        writer.close()
+    print(f"Wrote {writer.written} results to {args.output}")
+    if writer.failed:
+        print(f"{writer.failed} cases failed; run the same command again to retry them")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline triage over a JSONL file of cases")
+    parser.add_argument("cases", help="Input JSONL, one case per line")
+    parser.add_argument("output", help="Output JSONL, appended to and used as checkpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batches", action="store_true", help="Use the Message Batches API")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE,
+                        help="Requests per Message Batch")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL,
+                        help="Seconds between batch status checks")
+    parser.add_argument("--prompt", default=str(PROMPT_PATH))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Record real agent conversations and replay them offline.
+
+Recording runs the agent against the real Anthropic and Priaid APIs and stores
+every model response and Priaid answer, with its latency, in a JSON cassette.
+Replaying runs the same conversations against local fakes that sleep for the
+recorded latencies, then prints a per-stage latency breakdown built from the
+tracing spans.
+
+    python -m agent.replay record conversations.jsonl cassette.json
+    python -m agent.replay replay cassette.json --otel trace.json
+
+Each line of the conversations file is a JSON list of user messages.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from anthropic.types import Message
+from dotenv import load_dotenv
+
+from backend.app.core.tracing import export_otel_json, recorder, span, summarize
+from backend.app.services import medical_api
+
+from agent.app import MedicalAssistantLLM
+from agent.services import MedicalService
+
+
+PROMPT_PATH = Path(__file__).parent / "prompt.yaml"
+
+
+class ReplayDiverged(RuntimeError):
+    """The agent made a call the cassette has no recording for."""
+
+
+def new_cassette(conversations: List[List[str]]) -> Dict[str, Any]:
+    return {"conversations": conversations, "model_calls": [], "priaid_calls": []}
+
+
+def _priaid_key(symptoms: List[int], gender: str) -> str:
+    # The year of birth is derived from today's date, so it is left out of the
+    # key to keep cassettes replayable in later years.
+    return json.dumps([sorted(symptoms), gender])
+
+
+class _RecordingStream:
+    """Wraps a messages.stream() manager, recording latency and time to first token"""
+
+    def __init__(self, manager, cassette: Dict[str, Any]):
+        self._manager = manager
+        self._cassette = cassette
+        self._stream = None
+        self._start = 0.0
+        self._ttft = None
+
+    async def __aenter__(self):
+        self._start = time.perf_counter()
+        self._stream = await self._manager.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._manager.__aexit__(*exc_info)
+
+    async def __aiter__(self):
+        async for event in self._stream:
+            if self._ttft is None and event.type == "content_block_start":
+                self._ttft = time.perf_counter() - self._start
+            yield event
+
+    async def get_final_message(self) -> Message:
+        response = await self._stream.get_final_message()
+        self._cassette["model_calls"].append({
+            "response": response.model_dump(mode="json"),
+            "latency": time.perf_counter() - self._start,
+            "ttft": self._ttft,
+        })
+        return response
+
+
+class _RecordingMessages:
+    def __init__(self, messages, cassette: Dict[str, Any]):
+        self._messages = messages
+        self._cassette = cassette
+
+    async def create(self, **kwargs) -> Message:
+        start = time.perf_counter()
+        response = await self._messages.create(**kwargs)
+        self._cassette["model_calls"].append({
+            "response": response.model_dump(mode="json"),
+            "latency": time.perf_counter() - start,
+        })
+        return response
+
+    def stream(self, **kwargs) -> _RecordingStream:
+        return _RecordingStream(self._messages.stream(**kwargs), self._cassette)
+
+
+class RecordingAnthropic:
+    """Wraps an AsyncAnthropic client and records every model call."""
+
+    def __init__(self, client, cassette: Dict[str, Any]):
+        self.messages = _RecordingMessages(client.messages, cassette)
+
+
+class _FakeStream:
+    """Replays a recorded call as a stream: one event at the recorded TTFT."""
+
+    def __init__(self, call: Dict[str, Any], speed: float):
+        self._call = call
+        self._speed = speed
+        self._ttft = call.get("ttft") or 0.0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self._ttft * self._speed)
+        yield SimpleNamespace(type="content_block_start")
+
+    async def get_final_message(self) -> Message:
+        await asyncio.sleep(max(self._call["latency"] - self._ttft, 0.0) * self._speed)
+        return Message.model_validate(self._call["response"])
+
+
+class _FakeMessages:
+    def __init__(self, calls: List[Dict[str, Any]], speed: float):
+        self._calls = calls
+        self._index = 0
+        self._speed = speed
+
+    @property
+    def remaining(self) -> int:
+        return len(self._calls) - self._index
+
+    def _next_call(self) -> Dict[str, Any]:
+        if self._index >= len(self._calls):
+            raise ReplayDiverged("Replay diverged: no recorded model call left")
+        call = self._calls[self._index]
+        self._index += 1
+        return call
+
+    async def create(self, **kwargs) -> Message:
+        call = self._next_call()
+        await asyncio.sleep(call["latency"] * self._speed)
+        return Message.model_validate(call["response"])
+
+    def stream(self, **kwargs) -> _FakeStream:
+        return _FakeStream(self._next_call(), self._speed)
+
+
+class FakeAnthropic:
+    """Serves recorded model responses in order, after the recorded latency."""
+
+    def __init__(self, cassette: Dict[str, Any], speed: float = 1.0):
+        self.messages = _FakeMessages(cassette["model_calls"], speed)
+
+
+class RecordingPriaid:
+    """
+    Calls the real Priaid API and records the answers.
+
+    Specialisations are fetched below the shared cache, so that the recorded
+    latencies are those of the API and not of cache hits.
+    """
+
+    def __init__(self, cassette: Dict[str, Any]):
+        self._cassette = cassette
+        self._lock = threading.Lock()
+
+    def get_symptoms(self, language: str = "en-gb") -> list:
+        return medical_api.get_symptoms(language)
+
+    def get_specialisations(self, symptoms: List[int], gender: str, year_of_birth: int, **kwargs) -> list:
+        start = time.perf_counter()
+        result = medical_api.fetch_specialisations(symptoms, gender, year_of_birth, **kwargs)
+        with self._lock:
+            self._cassette["priaid_calls"].append({
+                "key": _priaid_key(symptoms, gender),
+                "result": result,
+                "latency": time.perf_counter() - start,
+            })
+        return result
+
+
+class FakePriaid:
+    """
+    Serves recorded Priaid answers, sleeping for the recorded latency.
+
+    The agent turns tool errors into tool results, so unrecorded calls are
+    also kept in ``diverged`` for the replay to fail on.
+    """
+
+    def __init__(self, cassette: Dict[str, Any], speed: float = 1.0):
+        self._calls: Dict[str, List[Dict[str, Any]]] = {}
+        for call in cassette["priaid_calls"]:
+            self._calls.setdefault(call["key"], []).append(call)
+        self._speed = speed
+        self._lock = threading.Lock()
+        self.diverged: List[str] = []
+
+    def get_symptoms(self, language: str = "en-gb") -> list:
+        return medical_api.get_symptoms(language)
+
+    def get_specialisations(self, symptoms: List[int], gender: str, year_of_birth: int, **kwargs) -> list:
+        key = _priaid_key(symptoms, gender)
+        with self._lock:
+            calls = self._calls.get(key)
+            if not calls:
+                self.diverged.append(key)
+                raise ReplayDiverged(f"Replay diverged: no recorded Priaid call for {key}")
+            call = calls.pop(0) if len(calls) > 1 else calls[0]
+        with span("priaid.http", endpoint="diagnosis/specialisations", replayed=True):
+            time.sleep(call["latency"] * self._speed)
+        return call["result"]
+
+
+async def run_conversations(
+    conversations: List[List[str]],
+    client: Any,
+    priaid: Any,
+    api_key: str = "",
+    prompt_path: Path = PROMPT_PATH
+) -> List[List[str]]:
+    """Run each conversation in a fresh agent and return the assistant replies."""
+    replies = []
+    for conversation in conversations:
+        assistant = MedicalAssistantLLM(
+            api_key,
+            prompt_path=str(prompt_path),
+            client=client,
+            service=MedicalService(priaid=priaid)
+        )
+        replies.append([
+            await assistant.process_message(message, raise_errors=True) for message in conversation
+        ])
+    return replies
+
+
+def format_breakdown(rows: List[Dict[str, Any]]) -> str:
+    """Render summarize() rows as a text table"""
+    lines = [f"{'stage':<36} {'count':>6} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9}"]
+    for row in rows:
+        lines.append(
+            f"{row['name']:<36} {row['count']:>6} {row['total_ms']:>10.1f} "
+            f"{row['mean_ms']:>9.1f} {row['p95_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def record(conversations_path: str, cassette_path: str) -> None:
+    import anthropic
+
+    load_dotenv()
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+
+    with open(conversations_path, "r", encoding="utf-8") as file:
+        conversations = [json.loads(line) for line in file if line.strip()]
+
+    cassette = new_cassette(conversations)
+    client = RecordingAnthropic(anthropic.AsyncAnthropic(api_key=api_key), cassette)
+    await run_conversations(conversations, client, RecordingPriaid(cassette), api_key)
+
+    with open(cassette_path, "w", encoding="utf-8") as file:
+        json.dump(cassette, file, ensure_ascii=False, indent=2)
+    print(f"Recorded {len(cassette['model_calls'])} model calls and "
+          f"{len(cassette['priaid_calls'])} Priaid calls to {cassette_path}")
+
+
+async def replay(cassette_path: str, speed: float = 1.0, otel_path: str = None) -> None:
+    """
+    Replay a cassette and print its latency breakdown.
+
+    :raises ReplayDiverged: If the agent made a call that was not recorded.
+    """
+    with open(cassette_path, "r", encoding="utf-8") as file:
+        cassette = json.load(file)
+
+    recorder.clear()
+    client, priaid = FakeAnthropic(cassette, speed), FakePriaid(cassette, speed)
+    await run_conversations(cassette["conversations"], client, priaid)
+    if priaid.diverged:
+        raise ReplayDiverged(f"Replay diverged: no recorded Priaid call for {priaid.diverged[0]}")
+    if client.messages.remaining:
+        raise ReplayDiverged(f"Replay diverged: {client.messages.remaining} recorded model calls left unused")
+    print(format_breakdown(summarize()))
+
+    if otel_path:
+        with open(otel_path, "w", encoding="utf-8") as file:
+            json.dump(export_otel_json(), file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay agent conversations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Run conversations against the real APIs")
+    record_parser.add_argument("conversations", help="JSONL file, one list of user messages per line")
+    record_parser.add_argument("cassette", help="Output cassette path")
+
+    replay_parser = commands.add_parser("replay", help="Replay a cassette against local fakes")
+    replay_parser.add_argument("cassette")
+    replay_parser.add_argument("--speed", type=float, default=1.0,
+                               help="Multiplier applied to recorded latencies")
+    replay_parser.add_argument("--otel", help="Write the spans as OTLP/JSON to this path")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record(args.conversations, args.cassette))
+    else:
+        try:
+            asyncio.run(replay(args.cassette, args.speed, args.otel))
+        except ReplayDiverged as e:
+            sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
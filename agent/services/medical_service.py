@@ -1,8 +1,20 @@
+import asyncio
+from datetime import date
 from typing import List, Dict
+
+from backend.app.services import medical_api, doctolib, geo, symptom_extractor
+from backend.app.services.triage import triage as run_triage
 from ..tools.base import Tool
 
 
 class MedicalService:
+    def __init__(self, priaid=None):
+        """
+        :param priaid: Provider of get_symptoms/get_specialisations. Defaults to
+            the backend medical_api module; replay runs pass a local fake.
+        """
+        self.priaid = priaid or medical_api
+
     @Tool(
         name="get_symptoms",
         description="""
@@ -12,14 +24,39 @@ class MedicalService:
         2. You need to look up specific symptom information
         3. You're helping diagnose a condition and need to check symptoms
         
-        The tool returns a list of symptoms with their IDs and detailed descriptions.
+        The tool returns a list of symptoms with their IDs and detailed descriptions,
+        named in the requested language ("en-gb" or "fr-fr").
         Note: This tool does not diagnose conditions, it only provides symptom information.
+        """,
+        cache_ttl=3600
+    )
+    async def get_symptoms(self, language: str = "en-gb") -> List[Dict]:
+        """
+        Get list of all available symptoms
+        :param language: Language of the symptom names, "en-gb" or "fr-fr"
         """
+        return await asyncio.to_thread(self.priaid.get_symptoms, language)
+
+    @Tool(
+        name="extract_symptoms",
+        description="""
+        Finds the symptoms mentioned in the patient's own words, in French or English,
+        e.g. "j'ai mal au ventre et je suis très agité".
+        Prefer this tool over get_symptoms to turn a complaint into symptom IDs.
+
+        The tool returns the matched symptoms with their IDs, names in the requested
+        language, a confidence between 0 and 1 and the part of the text that matched.
+        Ask the patient to clarify when nothing is found.
+        """,
+        cache_ttl=3600
     )
-    async def get_symptoms(self) -> List[Dict]:
-        """Get list of all available symptoms"""
-        # Implementation
-        pass
+    async def extract_symptoms(self, text: str, language: str = "en-gb") -> List[Dict]:
+        """
+        Extract symptoms from a free-text complaint.
+        :param text: The patient's description of their complaint
+        :param language: Language of the returned names, "en-gb" or "fr-fr"
+        """
+        return symptom_extractor.extract_symptoms(text, language=language)
 
     @Tool(
         name="get_specializations",
@@ -36,7 +73,10 @@ class MedicalService:
         
         The tool returns a ranked list of medical specializations with confidence scores.
         Note: These are suggestions only and not definitive medical advice.
-        """
+        """,
+        cache_ttl=600,
+        timeout=15,
+        max_concurrency=4
     )
     async def get_specializations(
         self, 
@@ -50,6 +90,104 @@ class MedicalService:
         :param age: Patient's age
         :param gender: Patient's gender (male/female)
         """
-        # Implementation
-        pass
+        year_of_birth = date.today().year - age
+        return await asyncio.to_thread(
+            self.priaid.get_specialisations, symptom_ids, gender, year_of_birth
+        )
+
+    @Tool(
+        name="get_doctolib_specialisations",
+        description="""
+        Retrieves the list of medical specialties available in the Doctolib directory.
+        Use it to translate a recommended specialization into the exact specialty
+        name expected by the get_doctors tool.
+        """,
+        cache_ttl=3600
+    )
+    async def get_doctolib_specialisations(self) -> List[str]:
+        """Get the Doctolib specialty names"""
+        return doctolib.get_doctolib_specialisations()
+
+    @Tool(
+        name="get_doctors",
+        description="""
+        Finds doctors listed on Doctolib for a given specialty.
+        The specialty must be one of the names returned by get_doctolib_specialisations.
+
+        The tool returns the doctors' names, expertise, contact information,
+        pricing and Doctolib URL.
+        """,
+        cache_ttl=60,
+        timeout=5
+    )
+    async def get_doctors(self, specialty: str) -> List[Dict]:
+        """
+        Get doctors for a Doctolib specialty.
+        :param specialty: Doctolib specialty name, e.g. "Pédiatre"
+        """
+        return await asyncio.to_thread(doctolib.get_doctors, specialty)
+
+    @Tool(
+        name="nearest_doctors",
+        description="""
+        Finds the doctors of a Doctolib specialty closest to the patient.
+        The specialty must be one of the names returned by get_doctolib_specialisations.
+
+        Required parameters:
+        - specialty: Doctolib specialty name
+        - location: The patient's postcode (e.g. "75011") or city (e.g. "Vincennes")
+
+        The tool returns the doctors closest first, with their distance in
+        kilometres, postcode and, when known, street address.
+        """,
+        cache_ttl=60,
+        timeout=5
+    )
+    async def nearest_doctors(self, specialty: str, location: str, k: int = 5) -> List[Dict]:
+        """
+        Get the doctors of a specialty closest to a location.
+        :param specialty: Doctolib specialty name, e.g. "Pédiatre"
+        :param location: Postcode or city name
+        :param k: Number of doctors to return
+        """
+        return await asyncio.to_thread(geo.nearest_doctors, specialty, postcode=location, k=k)
 
+    @Tool(
+        name="triage",
+        description="""
+        Runs the complete triage in a single call: resolves the symptoms, recommends
+        medical specializations and returns the top Doctolib doctors for each of them.
+        Prefer this tool over chaining get_symptoms, get_specializations,
+        get_doctolib_specialisations and get_doctors.
+
+        Required parameters:
+        - symptoms: Symptom names in English or French (e.g. "Abdominal pain",
+          "Fièvre") or IDs as strings
+        - age: Patient's age
+        - gender: Patient's gender (male/female)
+
+        The tool returns the resolved symptoms, any unknown ones, the ranked
+        specializations and the doctors grouped by Doctolib specialty.
+        """,
+        cache_ttl=600,
+        timeout=20,
+        max_concurrency=4
+    )
+    async def triage(
+        self,
+        symptoms: List[str],
+        age: int,
+        gender: str,
+        language: str = "en-gb"
+    ) -> Dict:
+        """
+        Run the server-side triage pipeline.
+        :param symptoms: Symptom names or IDs
+        :param age: Patient's age
+        :param gender: Patient's gender (male/female)
+        :param language: Language of the returned names, "en-gb" or "fr-fr"
+        """
+        return await run_triage(
+            symptoms, age, gender, language=language,
+            fetch_specialisations=self.priaid.get_specialisations
+        )
@@ -1,3 +1,4 @@
 from .base import Tool
+from .prefetch import PrefetchBuffer
 
-__all__ = ['Tool']
+__all__ = ['Tool', 'PrefetchBuffer']
@@ -1,6 +1,20 @@
-from typing import Any, Dict, List, get_type_hints
+from typing import Any, Callable, Dict, List, Optional, get_args, get_origin, get_type_hints
+from collections import OrderedDict
 from functools import wraps
+import asyncio
+import copy
 import inspect
+import time
+import weakref
+
+
+def _hashable(value: Any) -> Any:
+    """Turn lists and dicts from tool arguments into hashable cache-key parts"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
 
 
 class Tool:
@@ -10,33 +24,148 @@ class Tool:
     Usage:
         @Tool(
             name="get_weather",
-            description="Get the current weather in a given location"
+            description="Get the current weather in a given location",
+            cache_ttl=300,
+            timeout=10,
+            max_concurrency=4
         )
         async def get_weather(location: str) -> Dict:
             '''
             :param location: The city and state, e.g. San Francisco, CA
             '''
             ...
+
+    Options:
+        cache_ttl: Memoise results per argument tuple for this many seconds. Methods
+            are memoised per instance, and every call gets its own copy of the result
+        cache_size: Maximum number of memoised results, least recently used evicted
+        timeout: Per-call deadline in seconds
+        max_concurrency: Maximum number of concurrent calls per event loop. A call that
+            timed out keeps its slot until it actually ends, as threads cannot be cancelled
     """
     _registry: List['Tool'] = []
 
-    def __init__(self, name: str, description: str):
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        cache_ttl: Optional[float] = None,
+        cache_size: int = 128,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None
+    ):
         self.name = name
         self.description = description
         self.function = None
         self.schema = None
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._cache: OrderedDict = OrderedDict()
+        # Per-instance caches of tool methods; they go away with the instance.
+        self._instance_caches: "weakref.WeakKeyDictionary[Any, OrderedDict]" = weakref.WeakKeyDictionary()
+        self._is_method = False
+        # Semaphores bind to an event loop: one per loop, created on first use.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.stats = {
+            "calls": 0,
+            "cache_hits": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "total_latency": 0.0
+        }
 
     def __call__(self, func):
         self.function = func
         self.schema = self._generate_schema()
+        self._is_method = next(iter(inspect.signature(func).parameters), None) == "self"
         Tool._registry.append(self)
         
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            return await func(*args, **kwargs)
-        
+            self.stats["calls"] += 1
+            key = cache = None
+            if self.cache_ttl:
+                cache, key = self._cache_for(args, kwargs)
+                cached = cache.get(key)
+                if cached is not None and cached[1] > time.monotonic():
+                    cache.move_to_end(key)
+                    self.stats["cache_hits"] += 1
+                    return copy.deepcopy(cached[0])
+
+            start = time.perf_counter()
+            try:
+                result = await self._invoke(func, args, kwargs)
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+            finally:
+                self.stats["total_latency"] += time.perf_counter() - start
+
+            if cache is not None:
+                # Keep a private copy: callers may mutate the result they get.
+                cache[key] = (copy.deepcopy(result), time.monotonic() + self.cache_ttl)
+                cache.move_to_end(key)
+                while len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+            return result
+
+        wrapper.__tool__ = self
         return wrapper
 
+    def _cache_for(self, args: tuple, kwargs: dict):
+        """Return the cache to use for a call and the call's key in it"""
+        if self._is_method and args:
+            instance, args = args[0], args[1:]
+            cache = self._instance_caches.get(instance)
+            if cache is None:
+                cache = self._instance_caches[instance] = OrderedDict()
+        else:
+            cache = self._cache
+        return cache, (_hashable(args), _hashable(kwargs))
+
+    def _semaphore(self) -> Optional[asyncio.Semaphore]:
+        """Return the concurrency limit of the running event loop, if any"""
+        if not self.max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _invoke(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Run the tool under its concurrency limit and deadline"""
+        semaphore = self._semaphore()
+        if semaphore is None:
+            return await self._with_timeout(func(*args, **kwargs))
+
+        def release(task: asyncio.Future) -> None:
+            semaphore.release()
+            if not task.cancelled():
+                # Retrieved here so that a timed-out call's error is not logged as unhandled.
+                task.exception()
+
+        await semaphore.acquire()
+        # The slot is released when the call really ends, not when its caller
+        # stops waiting: cancelling a tool awaiting asyncio.to_thread leaves
+        # the thread running.
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        task.add_done_callback(release)
+        return await self._with_timeout(asyncio.shield(task))
+
+    async def _with_timeout(self, coroutine) -> Any:
+        if self.timeout is None:
+            return await coroutine
+        try:
+            return await asyncio.wait_for(coroutine, self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise TimeoutError(f"Tool {self.name} timed out after {self.timeout}s")
+
     def _generate_schema(self) -> Dict[str, Any]:
         """Generate the tool schema based on function signature"""
         sig = inspect.signature(self.function)
@@ -66,10 +195,18 @@ class Tool:
                 bool: "boolean"
             }
             
-            properties[param_name] = {
-                "type": type_map.get(param_type, "string"),
-                "description": param_doc
-            }
+            if get_origin(param_type) in (list, List):
+                item_type = (get_args(param_type) or (str,))[0]
+                properties[param_name] = {
+                    "type": "array",
+                    "items": {"type": type_map.get(item_type, "string")},
+                    "description": param_doc
+                }
+            else:
+                properties[param_name] = {
+                    "type": type_map.get(param_type, "string"),
+                    "description": param_doc
+                }
             
             if param.default == inspect.Parameter.empty:
                 required.append(param_name)
@@ -88,3 +225,25 @@ class Tool:
     def get_all_tools(cls) -> List[Dict[str, Any]]:
         """Get schemas for all registered tools"""
         return [tool.schema for tool in cls._registry]
+
+    @classmethod
+    def bind(cls, instance: Any) -> Dict[str, Callable]:
+        """Map tool names to the bound tool methods of an instance"""
+        tools = {}
+        for attr_name in dir(type(instance)):
+            tool = getattr(getattr(type(instance), attr_name), "__tool__", None)
+            if isinstance(tool, Tool):
+                tools[tool.name] = getattr(instance, attr_name)
+        return tools
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """Get call counts, cache hits and latency of every registered tool"""
+        stats = {}
+        for tool in cls._registry:
+            executed = tool.stats["calls"] - tool.stats["cache_hits"]
+            stats[tool.name] = {
+                **tool.stats,
+                "mean_latency": tool.stats["total_latency"] / executed if executed else 0.0
+            }
+        return stats
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class PrefetchBuffer:
+    """
+    Holds tool calls started speculatively, keyed by tool name and arguments.
+
+    Usage:
+        buffer = PrefetchBuffer()
+        buffer.schedule("get_doctors", {"specialty": "ORL"}, lambda: fetch("ORL"))
+        ...
+        hit, result = await buffer.take("get_doctors", {"specialty": "ORL"})
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], asyncio.Task]" = OrderedDict()
+        self.stats = {
+            "scheduled": 0,
+            "hits": 0,
+            "misses": 0,
+            "wasted": 0,
+            "saved_seconds": 0.0,
+        }
+
+    @staticmethod
+    def _key(tool_name: str, tool_args: Dict[str, Any]) -> Tuple[str, str]:
+        return tool_name, json.dumps(tool_args, sort_keys=True, ensure_ascii=False)
+
+    @staticmethod
+    async def _timed(factory: Callable[[], Awaitable]) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        result = await factory()
+        return result, time.perf_counter() - start
+
+    def schedule(
+        self,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        factory: Callable[[], Awaitable]
+    ) -> None:
+        """Start ``factory()`` in the background unless the same call is already buffered."""
+        key = self._key(tool_name, tool_args)
+        if key in self._entries:
+            return
+
+        while len(self._entries) >= self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            evicted.cancel()
+            self.stats["wasted"] += 1
+
+        self._entries[key] = asyncio.create_task(self._timed(factory))
+        self.stats["scheduled"] += 1
+
+    async def take(self, tool_name: str, tool_args: Dict[str, Any]) -> Tuple[bool, Any]:
+        """
+        Claim a buffered result.
+
+        Returns:
+            Tuple[bool, Any]: (hit, result). On a miss, or if the speculative
+            call failed, hit is False and the caller should run the tool itself.
+        """
+        task = self._entries.pop(self._key(tool_name, tool_args), None)
+        if task is None:
+            self.stats["misses"] += 1
+            return False, None
+
+        wait_start = time.perf_counter()
+        try:
+            result, duration = await task
+        except Exception:
+            self.stats["misses"] += 1
+            return False, None
+
+        waited = time.perf_counter() - wait_start
+        self.stats["hits"] += 1
+        self.stats["saved_seconds"] += max(duration - waited, 0.0)
+        return True, result
+
+    def clear(self) -> None:
+        """Cancel and drop every buffered call."""
+        for task in self._entries.values():
+            task.cancel()
+        self.stats["wasted"] += len(self._entries)
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters plus the hit rate over all lookups."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
@@ -16,6 +16,17 @@ class Settings(BaseSettings):
     SENTRY_DSN: Union[str, None] = None
     ENVIRONMENT: str = "local"  
     CORS_ORIGINS: List[str] = ["http://localhost:8080"]  
+    PRELOAD_CATALOGUES: bool = False
+
+    # Admission control for routes that wait on upstream services
+    # The limit starts at the initial value and adapts between 1 and the max.
+    UPSTREAM_INITIAL_CONCURRENCY: int = 8
+    UPSTREAM_MAX_CONCURRENCY: int = 16
+    UPSTREAM_QUEUE_SIZE: int = 32
+    UPSTREAM_QUEUE_TIMEOUT: float = 2.0
+    UPSTREAM_TARGET_LATENCY: float = 1.5
+    CLIENT_RATE_PER_SECOND: float = 5.0
+    CLIENT_BURST: int = 10
 
     API_KEY_MEDICAL_API: str
     SECRET_KEY_MEDICAL_API: str
@@ -0,0 +1,254 @@
+"""
+Ingress admission control and load shedding.
+
+Routes registered with the ``AdmissionController`` get:
+  - an adaptive (AIMD) concurrency limit driven by observed latency,
+  - a bounded wait queue with a queue-time deadline,
+  - per-client token-bucket quotas,
+and are answered immediately with 503 (saturated) or 429 (quota exceeded)
+plus a Retry-After header instead of piling up. Unregistered routes pass
+straight through, so cheap endpoints stay fast while upstream-bound ones
+are overloaded.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from . import metrics
+
+
+class Saturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Route saturated")
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted with additive increase / multiplicative decrease.
+
+    A request finishing under ``target_latency`` raises the limit by 1/limit
+    (about +1 per limit-sized window); a slow or failed one multiplies it by
+    ``backoff``. The limit always stays within ``[min_limit, max_limit]``.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        max_queue: int = 32,
+        queue_timeout: float = 2.0,
+        target_latency: float = 1.0,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.inflight = 0
+        self.latency_ewma = 0.0
+        self._waiters: deque = deque()
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0}
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait, from the queue depth and latency."""
+        backlog = (len(self._waiters) + 1) / max(self.limit, 1.0)
+        return max(1, math.ceil(backlog * (self.latency_ewma or self.target_latency)))
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue for at most ``queue_timeout``.
+
+        :raises Saturated: If the queue is full or the deadline passes.
+        """
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            self.stats["admitted"] += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise Saturated(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            # The slot is handed over by release(), which increments inflight.
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise Saturated(self.retry_after())
+        except asyncio.CancelledError:
+            # Cancelled right after being handed a slot: give it back.
+            if waiter.done() and not waiter.cancelled():
+                self.inflight -= 1
+                self._wake()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self.stats["admitted"] += 1
+
+    def release(self, latency: float, failed: bool = False) -> None:
+        """Free a slot and adapt the limit to the request's outcome."""
+        self.inflight -= 1
+        self.latency_ewma = latency if not self.latency_ewma else 0.8 * self.latency_ewma + 0.2 * latency
+
+        if failed or latency > self.target_latency:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to queued requests in arrival order."""
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "waiting": len(self._waiters),
+            "latency_ewma": round(self.latency_ewma, 4),
+        }
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+
+class ClientQuota:
+    """Per-client token buckets, keeping at most ``max_clients`` (LRU)."""
+
+    def __init__(self, rate: float = 5.0, burst: float = 10.0, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.rejected = 0
+
+    def take(self, client: str) -> Optional[int]:
+        """Consume one token; return None if allowed, else the Retry-After seconds."""
+        bucket = self._buckets.pop(client, None) or TokenBucket(self.burst)
+        self._buckets[client] = bucket
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+        now = time.monotonic()
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+        bucket.updated_at = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return None
+
+        self.rejected += 1
+        return max(1, math.ceil((1 - bucket.tokens) / self.rate))
+
+
+class AdmissionController:
+    """
+    Usage:
+        controller = AdmissionController()
+        controller.protect("/api/v1/mock/specialisations", AdaptiveLimiter(), ClientQuota())
+        app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    """
+
+    def __init__(self):
+        self.routes: Dict[str, Tuple[AdaptiveLimiter, Optional[ClientQuota]]] = {}
+        metrics.register("admission", self.get_stats)
+
+    def protect(self, path: str, limiter: AdaptiveLimiter, quota: Optional[ClientQuota] = None) -> None:
+        self.routes[path] = (limiter, quota)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            path: {
+                **limiter.get_stats(),
+                "quota_rejected": quota.rejected if quota else 0,
+            }
+            for path, (limiter, quota) in self.routes.items()
+        }
+
+
+def _client_id(scope) -> str:
+    # X-Forwarded-For is not read here: any client could rotate it to escape
+    # its quota. Behind a proxy, uvicorn (--proxy-headers) rewrites the
+    # client from it, but only for the peers in --forwarded-allow-ips.
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def _reject(send, status: int, retry_after: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(retry_after).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware applying an ``AdmissionController`` to HTTP requests."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        route = self.controller.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter, quota = route
+        if quota is not None:
+            retry_after = quota.take(_client_id(scope))
+            if retry_after is not None:
+                await _reject(send, 429, retry_after, "Too many requests")
+                return
+
+        try:
+            await limiter.acquire()
+        except Saturated as e:
+            await _reject(send, 503, e.retry_after, "Service overloaded, retry later")
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(time.monotonic() - start, failed=status >= 500)
@@ -0,0 +1,20 @@
+"""
+Registry of in-process metrics providers.
+
+Components register a callable returning a JSON-serialisable snapshot; the
+/metrics route collects all of them.
+"""
+from typing import Any, Callable, Dict
+
+
+_providers: Dict[str, Callable[[], Any]] = {}
+
+
+def register(name: str, provider: Callable[[], Any]) -> None:
+    """Expose ``provider()`` under ``name`` in the metrics snapshot."""
+    _providers[name] = provider
+
+
+def collect() -> Dict[str, Any]:
+    """Return a snapshot of every registered provider."""
+    return {name: provider() for name, provider in _providers.items()}
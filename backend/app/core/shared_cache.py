@@ -0,0 +1,150 @@
+"""
+Small cross-process cache backed by a local SQLite file.
+
+Forked workers cannot share Python dictionaries, so tokens and upstream
+results are stored here instead. Each process opens its own connection
+lazily, which keeps the cache safe to use after ``fork``.
+
+The file holds upstream bearer tokens, so it lives in a directory owned by
+the app (``$XDG_CACHE_HOME/medical-research`` by default) and is only
+readable by its owner.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "medical-research",
+)
+DEFAULT_PATH = os.path.join(CACHE_DIR, "shared_cache.sqlite3")
+# Seconds between two purges of expired entries by the same process.
+PURGE_INTERVAL = 300
+
+
+def _secure_file(path: str) -> None:
+    """
+    Create ``path`` (and its directory) readable by the current user only.
+
+    :raises PermissionError: If the file exists and belongs to another user.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if os.fstat(descriptor).st_uid != os.getuid():
+            raise PermissionError(f"Shared cache {path} is not owned by the current user")
+        os.fchmod(descriptor, 0o600)
+    finally:
+        os.close(descriptor)
+
+
+class SharedCache:
+    """
+    JSON key/value store with per-entry expiry.
+
+    Usage:
+        cache = SharedCache("/var/lib/medical-research/cache.sqlite3")
+        cache.set("priaid:token", {"Token": "..."}, ttl=3600)
+        cache.get("priaid:token")
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get("SHARED_CACHE_PATH", DEFAULT_PATH)
+        self._local = threading.local()
+        self._next_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return a connection owned by the current process and thread."""
+        pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != pid:
+            # SQLite creates the -wal and -shm files with the database's mode.
+            _secure_file(self.path)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or None if missing or expired."""
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def scan(self, prefix: str) -> List[Tuple[str, Any]]:
+        """Return the unexpired ``(key, value)`` entries whose key starts with ``prefix``."""
+        # Keys in [prefix, prefix with its last character incremented) share the prefix.
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self._connection().execute(
+            "SELECT key, value FROM cache WHERE key >= ? AND key < ? AND expires_at >= ?",
+            (prefix, upper, time.time()),
+        ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def _maybe_purge(self) -> None:
+        # Writers purge now and then, so expired entries do not pile up in
+        # processes that never run purge_expired (the agent, plain uvicorn).
+        now = time.time()
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL
+            self.purge_expired()
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serialisable ``value`` under ``key`` for ``ttl`` seconds."""
+        self._maybe_purge()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl),
+        )
+
+    def update(self, key: str, update: Callable[[Optional[Any]], Any], ttl: float) -> Any:
+        """
+        Atomically replace the value under ``key`` by ``update(current)``, where
+        ``current`` is None if the entry is missing or expired, and return it.
+        """
+        self._maybe_purge()
+        conn = self._connection()
+        # Take the write lock before reading, so concurrent updates serialise.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            current = json.loads(row[0]) if row is not None and row[1] >= time.time() else None
+            value = update(current)
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        cursor = self._connection().execute(
+            "DELETE FROM cache WHERE expires_at < ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+
+shared_cache = SharedCache()
@@ -0,0 +1,191 @@
+"""
+Lightweight span instrumentation.
+
+Spans are recorded in memory (bounded) and can be exported in the
+OpenTelemetry OTLP/JSON layout, so traces can be loaded into any
+OTLP-compatible viewer without adding the OpenTelemetry SDK as a dependency.
+
+Usage:
+    with span("priaid.get_specialisations", symptoms=3):
+        ...
+
+    @traced("doctolib.get_doctors")
+    def get_doctors(...):
+        ...
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+SERVICE_NAME = "medical-research"
+MAX_SPANS = 10000
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "error",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class SpanRecorder:
+    """Keeps the most recent finished spans in a bounded buffer."""
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def add(self, finished: Span) -> None:
+        with self._lock:
+            self._spans.append(finished)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+recorder = SpanRecorder()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a span around the enclosed block, nested under the current span."""
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        recorder.add(current)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator recording a span for every call of a sync or async function."""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def _otel_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def export_otel_json(spans: Optional[Iterable[Span]] = None) -> Dict[str, Any]:
+    """
+    Export spans in the OTLP/JSON trace layout.
+
+    :param spans: Spans to export. Defaults to everything in the recorder.
+    :return: A dictionary ready to be dumped with ``json.dump``.
+    """
+    spans = recorder.spans() if spans is None else spans
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+            },
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": item.trace_id,
+                        "spanId": item.span_id,
+                        "parentSpanId": item.parent_id or "",
+                        "name": item.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(item.start_ns),
+                        "endTimeUnixNano": str(item.end_ns or item.start_ns),
+                        "attributes": [
+                            {"key": key, "value": _otel_value(value)}
+                            for key, value in item.attributes.items()
+                        ],
+                        "status": (
+                            {"code": 2, "message": item.error} if item.error else {"code": 1}
+                        ),
+                    }
+                    for item in spans
+                ],
+            }],
+        }]
+    }
+
+
+def summarize(spans: Optional[Iterable[Span]] = None) -> List[Dict[str, Any]]:
+    """
+    Aggregate span durations per span name.
+
+    :return: One row per name with count, total, mean and p95 in milliseconds,
+             sorted by total time spent.
+    """
+    spans = recorder.spans() if spans is None else spans
+    durations: Dict[str, List[float]] = {}
+    for item in spans:
+        durations.setdefault(item.name, []).append(item.duration_ms)
+
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "total_ms": sum(values),
+            "mean_ms": sum(values) / len(values),
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+        })
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
@@ -0,0 +1,260 @@
+"""
+LLM usage accounting.
+
+Records, per model call, the token usage reported by the API, the latency and
+the time to first token, and splits the input tokens between the system
+prompt, the tool schemas, the conversation history and the tool results
+(proportionally to their serialized size, since the API only reports a
+total). Calls are aggregated per turn, per session and globally, with
+bounded cardinality: the most recent turns of a session are kept, sessions
+expire ``ttl`` seconds after their last turn, and tool names beyond
+``max_tools`` are folded into "other".
+
+Sessions and totals are kept in the shared SQLite cache rather than in
+process memory: the agent runs in its own process, and the backend's
+``/metrics`` routes read what it recorded from the same file
+(``SHARED_CACHE_PATH``). Each process writes its own totals row, with the
+time to first token as a fixed-size histogram, and readers add the rows up.
+Accounting is best effort: a failed write is logged, never raised.
+"""
+import bisect
+import json
+import logging
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+from . import metrics
+from .shared_cache import SharedCache, shared_cache
+
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ("system", "tools", "history", "tool_results")
+SESSION_KEY = "llm_usage:session:{}"
+TOTALS_PREFIX = "llm_usage:totals:"
+USAGE_TTL = 7 * 24 * 3600
+# Upper bounds, in seconds, of the time-to-first-token histogram buckets;
+# the last bucket holds everything slower.
+TTFT_BUCKETS = (0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+
+def context_sizes(system: str, tools: List[dict], messages: List[dict]) -> Dict[str, Any]:
+    """
+    Return the serialized size in characters of each part of a request, and
+    of the tool results per tool name.
+    """
+    tool_names = {}
+    sizes = {
+        "system": len(system),
+        "tools": len(json.dumps(tools, ensure_ascii=False)),
+        "history": 0,
+        "tool_results": 0,
+    }
+    per_tool: Dict[str, int] = {}
+
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            sizes["history"] += len(content)
+            continue
+        for block in content:
+            size = len(json.dumps(block, ensure_ascii=False, default=str))
+            if block.get("type") == "tool_use":
+                tool_names[block.get("id")] = block.get("name", "unknown")
+            if block.get("type") == "tool_result":
+                sizes["tool_results"] += size
+                name = tool_names.get(block.get("tool_use_id"), "unknown")
+                per_tool[name] = per_tool.get(name, 0) + size
+            else:
+                sizes["history"] += size
+
+    return {**sizes, "per_tool": per_tool}
+
+
+def _empty_process_totals() -> Dict[str, Any]:
+    return {**_empty_totals(), "sessions": 0, "ttft_buckets": [0] * (len(TTFT_BUCKETS) + 1)}
+
+
+def _ttft_p50(buckets: List[int]) -> Optional[float]:
+    """Return the upper bound of the histogram bucket holding the median."""
+    count = sum(buckets)
+    if not count:
+        return None
+    seen = 0
+    for bound, bucket in zip((*TTFT_BUCKETS, TTFT_BUCKETS[-1]), buckets):
+        seen += bucket
+        if seen * 2 >= count:
+            return bound
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 0,
+        "latency": 0.0,
+        "input_split": {component: 0.0 for component in COMPONENTS},
+        "tool_result_tokens": {},
+    }
+
+
+class UsageTracker:
+    """
+    Usage:
+        turn = usage_tracker.start_turn(session_id)
+        usage_tracker.record_call(turn, response.usage, system, tools, messages, latency, ttft)
+        usage_tracker.finish_turn(session_id, turn)
+    """
+
+    def __init__(
+        self,
+        cache: SharedCache = shared_cache,
+        max_turns: int = 50,
+        max_tools: int = 32,
+        ttl: float = USAGE_TTL
+    ):
+        self.cache = cache
+        self.max_turns = max_turns
+        self.max_tools = max_tools
+        self.ttl = ttl
+
+    def start_turn(self, session_id: str) -> Dict[str, Any]:
+        return {"session_id": session_id, "ttft": None, **_empty_totals()}
+
+    def _add(self, totals: Dict[str, Any], call: Dict[str, Any]) -> None:
+        for key in ("calls", "input_tokens", "output_tokens", "cache_creation_input_tokens",
+                    "cache_read_input_tokens", "latency"):
+            totals[key] += call[key]
+        for component in COMPONENTS:
+            totals["input_split"][component] += call["input_split"][component]
+        tool_tokens = totals["tool_result_tokens"]
+        for name, tokens in call["tool_result_tokens"].items():
+            if name not in tool_tokens and len(tool_tokens) >= self.max_tools:
+                name = "other"
+            tool_tokens[name] = tool_tokens.get(name, 0.0) + tokens
+
+    def record_call(
+        self,
+        turn: Dict[str, Any],
+        usage: Any,
+        system: str,
+        tools: List[dict],
+        messages: List[dict],
+        latency: float,
+        ttft: Optional[float] = None
+    ) -> None:
+        """Account one model call of a turn, from the API ``usage`` object."""
+        cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        total_input = usage.input_tokens + cache_creation + cache_read
+
+        sizes = context_sizes(system, tools, messages)
+        total_chars = sum(sizes[component] for component in COMPONENTS) or 1
+        tokens_per_char = total_input / total_chars
+
+        self._add(turn, {
+            "calls": 1,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_creation_input_tokens": cache_creation,
+            "cache_read_input_tokens": cache_read,
+            "latency": latency,
+            "input_split": {
+                component: sizes[component] * tokens_per_char for component in COMPONENTS
+            },
+            "tool_result_tokens": {
+                name: size * tokens_per_char for name, size in sizes["per_tool"].items()
+            },
+        })
+        if turn["ttft"] is None and ttft is not None:
+            turn["ttft"] = ttft
+
+    def finish_turn(self, session_id: str, turn: Dict[str, Any]) -> None:
+        """
+        Fold a finished turn into its session and the totals of this process.
+
+        Blocks on SQLite: async callers run it in a thread.
+        """
+        try:
+            self._write_turn(session_id, turn)
+        except Exception as e:
+            logger.warning("Could not record the usage of session %s: %s", session_id, e)
+
+    def _write_turn(self, session_id: str, turn: Dict[str, Any]) -> None:
+        new_session = False
+
+        def add_to_session(session: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            nonlocal new_session
+            if session is None:
+                new_session = True
+                session = {"turns": [], "totals": _empty_totals()}
+            session["turns"] = [*session["turns"], _summarize(turn)][-self.max_turns:]
+            self._add(session["totals"], turn)
+            return session
+
+        def add_to_totals(totals: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            totals = totals or _empty_process_totals()
+            self._add(totals, turn)
+            totals["sessions"] += new_session
+            if turn["ttft"] is not None:
+                totals["ttft_buckets"][bisect.bisect_left(TTFT_BUCKETS, turn["ttft"])] += 1
+            return totals
+
+        self.cache.update(SESSION_KEY.format(session_id), add_to_session, self.ttl)
+        # One row per process, so that workers do not rewrite the same row.
+        totals_key = f"{TOTALS_PREFIX}{socket.gethostname()}:{os.getpid()}"
+        self.cache.update(totals_key, add_to_totals, self.ttl)
+
+    def session_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the totals and recent turns of a session, or None if unknown."""
+        session = self.cache.get(SESSION_KEY.format(session_id))
+        if session is None:
+            return None
+        return {
+            "session_id": session_id,
+            "totals": _summarize(session["totals"]),
+            "turns": session["turns"],
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the totals of every process; ``ttft_p50`` is a histogram bucket bound."""
+        totals = _empty_process_totals()
+        for _, process_totals in self.cache.scan(TOTALS_PREFIX):
+            self._add(totals, process_totals)
+            totals["sessions"] += process_totals["sessions"]
+            for bucket, count in enumerate(process_totals["ttft_buckets"]):
+                totals["ttft_buckets"][bucket] += count
+        buckets = totals.pop("ttft_buckets")
+        sessions = totals.pop("sessions")
+        return {
+            **_summarize(totals),
+            "sessions": sessions,
+            "ttft_p50": _ttft_p50(buckets),
+        }
+
+
+def _summarize(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Round the estimates and add the prompt-cache hit ratio."""
+    total_input = (
+        totals["input_tokens"] + totals["cache_creation_input_tokens"] + totals["cache_read_input_tokens"]
+    )
+    summary = {
+        **{key: value for key, value in totals.items() if key not in ("input_split", "tool_result_tokens")},
+        "latency": round(totals["latency"], 4),
+        "input_split": {key: round(value) for key, value in totals["input_split"].items()},
+        "tool_result_tokens": {
+            key: round(value) for key, value in
+            sorted(totals["tool_result_tokens"].items(), key=lambda item: item[1], reverse=True)
+        },
+        "cache_hit_ratio": round(totals["cache_read_input_tokens"] / total_input, 4) if total_input else 0.0,
+    }
+    if summary.get("ttft") is not None:
+        summary["ttft"] = round(summary["ttft"], 4)
+    return summary
+
+
+usage_tracker = UsageTracker()
+metrics.register("llm_usage", usage_tracker.get_stats)
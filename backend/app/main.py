@@ -1,10 +1,12 @@
 from fastapi import APIRouter
-from app.routes import hello_world
+from app.routes import doctors, hello_world, metrics, triage
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 from app.config import settings
+from app.services.catalogue import preload_catalogues
+from app.core.admission import AdaptiveLimiter, AdmissionControlMiddleware, AdmissionController, ClientQuota
 
 
 
@@ -12,6 +14,11 @@ def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+if settings.PRELOAD_CATALOGUES:
+    # Built at import time so a pre-forking server (gunicorn --preload) shares
+    # the catalogues copy-on-write across its workers.
+    preload_catalogues()
+
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
@@ -22,6 +29,28 @@ app = FastAPI(
 )
 
 
+def upstream_limiter() -> AdaptiveLimiter:
+    return AdaptiveLimiter(
+        initial_limit=settings.UPSTREAM_INITIAL_CONCURRENCY,
+        max_limit=settings.UPSTREAM_MAX_CONCURRENCY,
+        max_queue=settings.UPSTREAM_QUEUE_SIZE,
+        queue_timeout=settings.UPSTREAM_QUEUE_TIMEOUT,
+        target_latency=settings.UPSTREAM_TARGET_LATENCY,
+    )
+
+
+def client_quota() -> ClientQuota:
+    return ClientQuota(rate=settings.CLIENT_RATE_PER_SECOND, burst=settings.CLIENT_BURST)
+
+
+# Only upstream-bound routes are admission controlled; the others pass through.
+admission = AdmissionController()
+for path in ("/token", "/mock/specialisations", "/triage"):
+    admission.protect(f"{settings.API_V1_STR}{path}", upstream_limiter(), client_quota())
+
+# Added before CORS so that rejections still carry the CORS headers.
+app.add_middleware(AdmissionControlMiddleware, controller=admission)
+
 if settings.CORS_ORIGINS:
     app.add_middleware(
         CORSMiddleware,
@@ -32,3 +61,6 @@ if settings.CORS_ORIGINS:
     )
 
 app.include_router(hello_world.router, prefix=settings.API_V1_STR, tags=["hello_world"])
+app.include_router(doctors.router, prefix=settings.API_V1_STR, tags=["doctors"])
+app.include_router(triage.router, prefix=settings.API_V1_STR, tags=["triage"])
+app.include_router(metrics.router, prefix=settings.API_V1_STR, tags=["metrics"])
@@ -0,0 +1,78 @@
+import json
+from typing import Iterator, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.services.doctolib import DOCTOR_FIELDS, get_doctor, iter_doctors
+from app.services.geo import nearest_doctors
+
+
+router = APIRouter()
+
+# Records serialised per chunk: keeps memory flat while avoiding one
+# threadpool hop per line.
+EXPORT_CHUNK_SIZE = 64
+
+
+def _ndjson_chunks(records: Iterator[dict]) -> Iterator[bytes]:
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@router.get("/doctors/export")
+def export_doctors(
+    specialty: List[str] = Query(default=[]),
+    fields: List[str] = Query(default=[]),
+):
+    """
+    Stream standardized doctors as NDJSON, one doctor per line.
+
+    - specialty: repeat to restrict the export to some specialties (default: all)
+    - fields: repeat to project each record on these fields (default: all)
+    """
+    unknown = set(fields) - set(DOCTOR_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    return StreamingResponse(
+        _ndjson_chunks(iter_doctors(specialty, fields)),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/doctors/nearest")
+def nearest(
+    specialty: str,
+    lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    postcode: Optional[str] = None,
+    k: int = Query(default=5, ge=1, le=50),
+):
+    """
+    Retrieve the k doctors of a specialty closest to a point, closest first.
+
+    - specialty: Doctolib specialty name
+    - lat, lon: coordinates of the patient
+    - postcode: postcode or city name, used when lat and lon are not given
+    """
+    try:
+        return nearest_doctors(specialty, lat, lon, postcode, k)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+
+@router.get("/doctors/{doctor_id}")
+async def doctor(doctor_id: str):
+    """
+    Retrieve one doctor by ID, with all the specialties it is listed under.
+    """
+    result = get_doctor(doctor_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Unknown doctor: {doctor_id}")
+    return result
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.services.medical_api import get_access_token, get_specialisations
 from app.config import settings
 import requests
@@ -17,7 +18,9 @@ async def token():
     Retrieve the access token using credentials from the environment.
     """
     try:
-        token_data = get_access_token(settings.API_KEY_MEDICAL_API, settings.SECRET_KEY_MEDICAL_API)
+        token_data = await run_in_threadpool(
+            get_access_token, settings.API_KEY_MEDICAL_API, settings.SECRET_KEY_MEDICAL_API
+        )
         return token_data
     except requests.exceptions.HTTPError as http_err:
         # Return a 400 error if the token request fails (e.g., wrong credentials)
@@ -36,13 +39,13 @@ async def mock_specialisations():
     Returns a mocked list of specialisations.
     """
     # Fixed input values
-    token = get_access_token(settings.API_KEY_MEDICAL_API, settings.SECRET_KEY_MEDICAL_API)["Token"]
     symptoms = [981]
     gender = "male"
     # Convert age 20 to year_of_birth (assuming current year 2025 for example)
     year_of_birth = 2025 - 20  # i.e., 2005
     try: 
-        data = get_specialisations(token,symptoms , gender, year_of_birth)
+        # Blocking Priaid calls run in the threadpool so they do not stall the event loop
+        data = await run_in_threadpool(get_specialisations, symptoms, gender, year_of_birth)
         return data
     except requests.exceptions.HTTPError as http_err:
         raise HTTPException(status_code=400, detail=f"HTTP error: {http_err}")
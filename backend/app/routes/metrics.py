@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from app.core import metrics
+from app.core.usage import usage_tracker
+
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Snapshot of the in-process metrics (admission control, ...).
+    """
+    return metrics.collect()
+
+
+@router.get("/metrics/usage/{session_id}")
+async def session_usage(session_id: str):
+    """
+    Token, prompt-cache and latency accounting of one agent session, as
+    recorded by the agent in the shared cache.
+    """
+    summary = usage_tracker.session_summary(session_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return summary
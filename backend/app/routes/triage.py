@@ -0,0 +1,42 @@
+from typing import List, Literal, Union
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from app.services.triage import triage
+import requests
+
+
+router = APIRouter()
+
+
+class TriageRequest(BaseModel):
+    symptoms: List[Union[int, str]] = Field(min_length=1)
+    age: int = Field(ge=0, le=130)
+    gender: Literal["male", "female"]
+    max_specialties: int = Field(default=3, ge=1, le=10)
+    doctors_per_specialty: int = Field(default=5, ge=1, le=50)
+    # Checked against the symptom snapshots by triage().
+    language: str = "en-gb"
+
+
+@router.post("/triage")
+async def run_triage(request: TriageRequest):
+    """
+    Resolve symptoms, fetch the Priaid specialisations, map them to Doctolib
+    specialties and return the top doctors for each, in a single call.
+    """
+    try:
+        return await triage(
+            request.symptoms,
+            request.age,
+            request.gender,
+            request.max_specialties,
+            request.doctors_per_specialty,
+            request.language,
+        )
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    except requests.exceptions.HTTPError as http_err:
+        raise HTTPException(status_code=400, detail=f"HTTP error: {http_err}")
+    except Exception as err:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {err}")
@@ -1,4 +1,5 @@
 from .medical_api import get_symptoms, get_specialisations
-from .doctolib import get_doctors, get_doctolib_specialisations
+from .doctolib import get_doctors, get_doctolib_specialisations, map_specialisations, iter_doctors
+from .symptom_extractor import extract_symptoms
 
-__all__ = ["get_symptoms", "get_specialisations", "get_doctors", "get_doctolib_specialisations"]
\ No newline at end of file
+__all__ = ["get_symptoms", "get_specialisations", "get_doctors", "get_doctolib_specialisations", "map_specialisations", "iter_doctors", "extract_symptoms"]
\ No newline at end of file
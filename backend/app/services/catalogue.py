@@ -0,0 +1,236 @@
+"""
+Read-only catalogues of symptoms and doctors.
+
+The catalogues are built once per process from the JSON files bundled next to
+this module, or from the doctor store once it has been populated by
+``app.services.ingest``. When ``preload_catalogues`` is called in a pre-fork
+master (see ``backend/gunicorn.conf.py``) every worker inherits the same pages
+copy-on-write instead of parsing its own private copy.
+
+New store versions are picked up without a restart: ``get_catalogue`` checks
+the store version at most every ``CATALOGUE_RELOAD_INTERVAL`` seconds and
+reloads only the specialty partitions that changed.
+"""
+import gc
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Tuple
+
+from .doctor_store import DoctorStore, doctor_id, doctor_store
+
+if TYPE_CHECKING:
+    from .symptom_snapshots import SymptomSnapshots
+
+
+DATA_DIR = Path(__file__).parent
+SYMPTOMS_PATH = DATA_DIR / "symptoms.json"
+DOCTORS_PATH = DATA_DIR / "grouped_by_specialite.json"
+RELOAD_INTERVAL = float(os.environ.get("CATALOGUE_RELOAD_INTERVAL", 5))
+
+
+class Catalogue:
+    """
+    Immutable snapshot of the symptom and doctor data.
+
+    ``symptoms`` are the default-language records; ``symptom_snapshots``
+    holds every language and the cross-language name index.
+
+    Each doctor is stored once in ``doctors`` under its stable ID and
+    ``index`` maps every specialty to the IDs of its doctors, so a practice
+    listed under several specialties shares a single record. Records are
+    exposed as ``MappingProxyType`` views so that callers cannot mutate pages
+    shared between forked workers.
+    """
+    __slots__ = (
+        "symptoms", "symptom_snapshots", "doctors", "index", "doctor_specialties",
+        "specialties", "version", "partition_versions",
+    )
+
+    def __init__(
+        self,
+        symptom_snapshots: "SymptomSnapshots",
+        doctors: Mapping[str, Mapping],
+        index: Mapping[str, Tuple[str, ...]],
+        version: int = 0,
+        partition_versions: Optional[Dict[str, int]] = None,
+    ):
+        self.symptom_snapshots = symptom_snapshots
+        self.symptoms = symptom_snapshots.symptoms()
+        self.doctors = doctors
+        self.index = index
+        self.specialties = tuple(index.keys())
+        # Store version the doctors were loaded from; 0 for the bundled JSON.
+        self.version = version
+        self.partition_versions = MappingProxyType(dict(partition_versions or {}))
+
+        doctor_specialties: Dict[str, list] = {}
+        for specialty, ids in index.items():
+            for key in ids:
+                doctor_specialties.setdefault(key, []).append(specialty)
+        self.doctor_specialties = MappingProxyType({
+            key: tuple(specialties) for key, specialties in doctor_specialties.items()
+        })
+
+    def doctors_for(self, specialty: str) -> Tuple[Mapping, ...]:
+        """Return the doctor records of a specialty, in listing order."""
+        return tuple(self.doctors[key] for key in self.index.get(specialty, ()))
+
+
+_catalogue: Optional[Catalogue] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _freeze(record: dict) -> Mapping:
+    """Return a read-only view of a record, turning list values into tuples."""
+    return MappingProxyType({
+        key: value if not isinstance(value, list) else tuple(value)
+        for key, value in record.items()
+    })
+
+
+def thaw(record: Mapping) -> dict:
+    """Return a mutable copy of a frozen record, safe to hand to callers."""
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in record.items()
+    }
+
+
+def _add_partition(doctors: Dict[str, Mapping], records: Iterable[dict], replace: bool = False) -> Tuple[str, ...]:
+    """
+    Store the standardized ``records`` of one specialty in ``doctors`` and
+    return their IDs. An existing record is kept unless ``replace`` is set.
+    """
+    ids = []
+    for record in records:
+        key = doctor_id(record)
+        if replace or key not in doctors:
+            doctors[key] = _freeze({"id": key, **record})
+        if key not in ids:
+            ids.append(key)
+    return tuple(ids)
+
+
+def build_catalogue(
+    symptoms_path: Path = SYMPTOMS_PATH,
+    doctors_path: Path = DOCTORS_PATH,
+    store: DoctorStore = doctor_store,
+) -> Catalogue:
+    """
+    Parse the bundled data into an immutable ``Catalogue``.
+
+    Symptoms come from every language snapshot next to ``symptoms_path``.
+    Doctors come from the doctor store when it holds any version, otherwise
+    from the bundled grouped JSON file.
+
+    :raises FileNotFoundError: If one of the data files is missing.
+    """
+    from .doctolib import standardize_doctor
+    from .symptom_snapshots import load_snapshots
+
+    symptoms = load_snapshots(symptoms_path.parent, symptoms_path)
+
+    doctors: Dict[str, Mapping] = {}
+
+    if store.exists() and store.version():
+        versions = store.partition_versions()
+        index = {
+            specialty: _add_partition(doctors, store.iter_partition(specialty))
+            for specialty in versions
+        }
+        return Catalogue(
+            symptoms, MappingProxyType(doctors), MappingProxyType(index),
+            max(versions.values()), versions,
+        )
+
+    if not doctors_path.exists():
+        raise FileNotFoundError(f"Catalogue file not found at path: {doctors_path}")
+
+    with open(doctors_path, "r", encoding="utf-8") as file:
+        grouped = json.load(file)
+
+    index = {
+        key.strip(): _add_partition(doctors, (standardize_doctor(doctor) for doctor in records))
+        for key, records in grouped.items()
+    }
+
+    return Catalogue(symptoms, MappingProxyType(doctors), MappingProxyType(index))
+
+
+def refresh_catalogue(catalogue: Catalogue, store: DoctorStore = doctor_store) -> Catalogue:
+    """
+    Return a catalogue reflecting the latest store version.
+
+    Only partitions whose version changed are read back; the records of the
+    others, and the symptom snapshots, are shared with ``catalogue``.
+    """
+    versions = store.partition_versions()
+    if not versions:
+        return catalogue
+
+    if catalogue.version:
+        doctors = dict(catalogue.doctors)
+        index = dict(catalogue.index)
+        changed = [
+            specialty for specialty, version in versions.items()
+            if catalogue.partition_versions.get(specialty) != version
+        ]
+    else:
+        # Switching from the bundled JSON to the store: the store is authoritative.
+        doctors, index = {}, {}
+        changed = list(versions)
+
+    for specialty in changed:
+        index[specialty] = _add_partition(doctors, store.iter_partition(specialty), replace=True)
+
+    # Drop records no partition refers to any more.
+    referenced = {key for ids in index.values() for key in ids}
+    doctors = {key: record for key, record in doctors.items() if key in referenced}
+
+    return Catalogue(
+        catalogue.symptom_snapshots, MappingProxyType(doctors), MappingProxyType(index),
+        max(versions.values()), versions,
+    )
+
+
+def get_catalogue() -> Catalogue:
+    """
+    Return the process-wide catalogue, building it on first use and
+    refreshing it when the doctor store has a newer version.
+    """
+    global _catalogue, _checked_at
+    if _catalogue is None:
+        with _lock:
+            if _catalogue is None:
+                _catalogue = build_catalogue(store=doctor_store)
+                _checked_at = time.monotonic()
+    elif time.monotonic() - _checked_at > RELOAD_INTERVAL:
+        with _lock:
+            if time.monotonic() - _checked_at > RELOAD_INTERVAL:
+                _checked_at = time.monotonic()
+                if doctor_store.exists() and doctor_store.version() != _catalogue.version:
+                    _catalogue = refresh_catalogue(_catalogue, doctor_store)
+    return _catalogue
+
+
+def preload_catalogues() -> Catalogue:
+    """
+    Build the catalogues eagerly and move them out of the cyclic GC.
+
+    Meant to be called in the master process before workers are forked.
+    ``gc.freeze`` keeps the collector from writing to the headers of the
+    preloaded objects, which would otherwise dirty the shared pages. The
+    spatial index of ``app.services.geo`` is built here too for the same reason.
+    """
+    from .geo import get_spatial_index
+
+    catalogue = get_catalogue()
+    get_spatial_index()
+    gc.collect()
+    gc.freeze()
+    return catalogue
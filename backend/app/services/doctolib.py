@@ -1,5 +1,26 @@
-import os, json
+from typing import Iterator, Optional
 
+from ..core.tracing import traced
+from .catalogue import get_catalogue, thaw
+
+
+# Priaid (ApiMedic) specialisation names mapped to the Doctolib specialties we hold.
+PRIAID_TO_DOCTOLIB = {
+    "General practice": ["Médecin généraliste"],
+    "Allergology": ["Allergologue"],
+    "Dermatology": ["Dermatologue et vénérologue"],
+    "Infectiology": ["Infectiologue"],
+    "Internal medicine": ["Spécialiste en médecine interne"],
+    "Ophthalmology": ["Ophtalmologue", "Centre d'ophtalmologie"],
+    "Otolaryngology": ["ORL"],
+    "Pediatrics": ["Pédiatre"],
+    "Psychiatry": ["Psychologue"],
+    "Psychotherapy": ["Psychologue"],
+    "Pulmonology": ["Pneumologue"],
+}
+
+
+@traced("doctolib.get_doctolib_specialisations")
 def get_doctolib_specialisations() -> list:
     """
     Retrieve a list of specialisations.
@@ -13,6 +34,27 @@ def get_doctolib_specialisations() -> list:
     specialisations = ['Médecin généraliste', 'Cabinet médical', 'Médecin morphologue et anti-âge', 'Cabinet pluridisciplinaire', 'Centre de santé', 'Maison de santé', 'Infectiologue', 'Pharmacie', 'Centre laser et esthétique', 'Interne en médecine', 'Ophtalmologue', "Établissement de Santé Privé d'Intérêt Collectif (ESPIC)", "Centre d'ophtalmologie", 'Cabinet médical et dentaire', 'Centre médical et dentaire', 'Allergologue', 'Pneumologue', 'Pédiatre', 'ORL', 'Dermatologue et vénérologue', 'Hôpital public', 'Spécialiste en médecine interne', 'Psychologue']
     
     return specialisations
+
+@traced("doctolib.map_specialisations")
+def map_specialisations(priaid_names: list) -> list:
+    """
+    Map Priaid specialisation names to Doctolib specialty names.
+
+    Parameters:
+        priaid_names (list): Priaid specialisation names, most relevant first.
+
+    Returns:
+        list: The matching Doctolib specialties in the same order, without duplicates.
+              Names with no Doctolib equivalent are skipped.
+    """
+    specialties = []
+    for name in priaid_names:
+        for specialty in PRIAID_TO_DOCTOLIB.get(name.strip(), []):
+            if specialty not in specialties:
+                specialties.append(specialty)
+    return specialties
+
+
 def standardize_doctor(doctor: dict) -> dict:
     """
     Standardizes a doctor's dictionary keys to English.
@@ -41,6 +83,7 @@ def standardize_doctor(doctor: dict) -> dict:
         "url": doctor.get("url", "")
     }
 
+@traced("doctolib.get_doctors")
 def get_doctors(specialisation_name: str) -> list:
     """
     Retrieve a list of doctors based on a given specialisation.
@@ -49,20 +92,60 @@ def get_doctors(specialisation_name: str) -> list:
         specialisation_name (str): The name of the specialisation.
 
     Returns:
-        list: A list of doctor dictionaries for the given specialisation.
-              Returns an empty list if no doctors are found.
+        list: A list of doctor dictionaries, each with its stable "id", for the
+              given specialisation. Returns an empty list if no doctors are found.
     """
-    file_path = "backend/app/services/grouped_by_specialite.json"
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Symptoms file not found at path: {file_path}")
+    doctors = get_catalogue().doctors_for(specialisation_name.strip())
+    return [thaw(doctor) for doctor in doctors]
+
+DOCTOR_FIELDS = ("id", "specialty", "description", "expertise", "contact_info", "image", "name", "phones", "pricing", "url")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    normalized_spec = specialisation_name.strip()
+def iter_doctors(specialisation_names: list = None, fields: list = None) -> Iterator[dict]:
+    """
+    Lazily yield standardized doctors, one at a time, with their specialty.
 
-    for key, doctors in data.items():
-        if key.strip() == normalized_spec:
-            return [standardize_doctor(doctor) for doctor in doctors]
+    The catalogue snapshot is taken once, so a reload during the iteration
+    does not mix two versions.
 
-    return []
+    Parameters:
+        specialisation_names (list): Specialties to include. All specialties if empty.
+        fields (list): Fields to keep in each record (see DOCTOR_FIELDS). All if empty.
+
+    Returns:
+        Iterator[dict]: Standardized doctor dictionaries including a "specialty" key.
+
+    Raises:
+        ValueError: If a requested field is unknown.
+    """
+    unknown = set(fields or ()) - set(DOCTOR_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    catalogue = get_catalogue()
+    names = [name.strip() for name in specialisation_names] if specialisation_names else catalogue.specialties
+
+    for specialty in names:
+        for doctor in catalogue.doctors_for(specialty):
+            record = {"specialty": specialty, **thaw(doctor)}
+            if fields:
+                record = {field: record[field] for field in fields}
+            yield record
+
+
+@traced("doctolib.get_doctor")
+def get_doctor(doctor_id: str) -> Optional[dict]:
+    """
+    Retrieve a single doctor by its stable ID, with every specialty it is listed under.
+
+    Parameters:
+        doctor_id (str): The doctor's ID, as returned in the "id" field of get_doctors.
+
+    Returns:
+        dict: The standardized doctor with a "specialties" list, or None if unknown.
+    """
+    catalogue = get_catalogue()
+    doctor = catalogue.doctors.get(doctor_id)
+    if doctor is None:
+        return None
+    return {**thaw(doctor), "specialties": list(catalogue.doctor_specialties.get(doctor_id, ()))}
@@ -0,0 +1,140 @@
+"""
+Versioned on-disk store of standardized doctors.
+
+Doctors are upserted by a stable key into a local SQLite file and grouped in
+one partition per specialty. Every ingestion bumps the version of the
+partitions it touched, so serving processes reload only those partitions.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+DEFAULT_PATH = Path(__file__).parent / "doctors.sqlite3"
+
+
+def normalize_profile_url(url: str) -> str:
+    """
+    Return a Doctolib profile URL without its tracking parameters.
+
+    Only the path and the ``pid`` (practice) parameter identify a listing:
+    ``...?highlight[speciality_ids][]=4&pid=practice-25062`` and ``...=7&pid=...``
+    are the same practice.
+    """
+    parts = urlsplit(url.strip())
+    normalized = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/')}"
+    pid = parse_qs(parts.query).get("pid")
+    return f"{normalized}?pid={pid[0]}" if pid else normalized
+
+
+def doctor_key(doctor: dict) -> str:
+    """
+    Return a stable key for a standardized doctor.
+
+    The Doctolib profile URL, normalized, identifies a practitioner at a
+    practice; records without one fall back to a hash of their name and
+    phone numbers.
+    """
+    url = doctor.get("url", "").strip()
+    if url:
+        return normalize_profile_url(url)
+    identity = json.dumps([doctor.get("name", ""), sorted(doctor.get("phones", []))])
+    return "sha1:" + hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+
+def doctor_id(doctor: dict) -> str:
+    """Return a short stable ID for a standardized doctor, derived from ``doctor_key``."""
+    return hashlib.sha1(doctor_key(doctor).encode("utf-8")).hexdigest()[:16]
+
+
+class DoctorStore:
+    """
+    Usage:
+        store = DoctorStore()
+        store.upsert([("Pédiatre", doctor)])
+        store.commit_partitions({"Pédiatre"})
+    """
+
+    def __init__(self, path: str = None):
+        self.path = str(path or os.environ.get("DOCTOR_STORE_PATH", DEFAULT_PATH))
+        self._local = threading.local()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return a connection owned by the current process and thread."""
+        pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != pid:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS doctors ("
+                " specialty TEXT NOT NULL, doctor_key TEXT NOT NULL, record TEXT NOT NULL,"
+                " PRIMARY KEY (specialty, doctor_key));"
+                "CREATE TABLE IF NOT EXISTS partitions ("
+                " specialty TEXT PRIMARY KEY, version INTEGER NOT NULL);"
+            )
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def upsert(self, rows: Iterable[Tuple[str, dict]]) -> None:
+        """Insert or replace (specialty, standardized doctor) rows without committing."""
+        self._connection().executemany(
+            "INSERT INTO doctors (specialty, doctor_key, record) VALUES (?, ?, ?) "
+            "ON CONFLICT (specialty, doctor_key) DO UPDATE SET record = excluded.record",
+            (
+                (specialty, doctor_key(doctor), json.dumps(doctor, ensure_ascii=False))
+                for specialty, doctor in rows
+            ),
+        )
+
+    def clear_partition(self, specialty: str) -> None:
+        """Delete the doctors of a specialty without committing."""
+        self._connection().execute("DELETE FROM doctors WHERE specialty = ?", (specialty,))
+
+    def rollback(self) -> None:
+        """Discard pending upserts and deletions."""
+        self._connection().rollback()
+
+    def commit_partitions(self, specialties: Iterable[str]) -> int:
+        """
+        Publish pending upserts and bump the version of the touched partitions.
+
+        :return: The new store version.
+        """
+        conn = self._connection()
+        version = self.version() + 1
+        conn.executemany(
+            "INSERT INTO partitions (specialty, version) VALUES (?, ?) "
+            "ON CONFLICT (specialty) DO UPDATE SET version = excluded.version",
+            ((specialty, version) for specialty in specialties),
+        )
+        conn.commit()
+        return version
+
+    def version(self) -> int:
+        """Return the latest partition version, 0 for an empty store."""
+        row = self._connection().execute("SELECT MAX(version) FROM partitions").fetchone()
+        return row[0] or 0
+
+    def partition_versions(self) -> Dict[str, int]:
+        return dict(self._connection().execute("SELECT specialty, version FROM partitions"))
+
+    def iter_partition(self, specialty: str) -> Iterator[dict]:
+        """Yield the doctors of a specialty in insertion order."""
+        cursor = self._connection().execute(
+            "SELECT record FROM doctors WHERE specialty = ? ORDER BY rowid", (specialty,)
+        )
+        for (record,) in cursor:
+            yield json.loads(record)
+
+
+doctor_store = DoctorStore()
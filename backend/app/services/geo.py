@@ -0,0 +1,351 @@
+"""
+Nearest-doctor search over the catalogue.
+
+Doctors are placed on the map once per catalogue snapshot, without any network
+call. The position comes from the first postcode of the bundled centroid table
+(``postcode_centroids.csv``) found in the record's free text, else from the
+city slug of its Doctolib URL (``/medecin-generaliste/<city>/...``). Records
+matching neither are left out of the index.
+
+Located doctors are kept per specialty in a KD-tree over their position on
+the unit sphere, where the straight-line (chord) distance ranks points exactly
+like the great-circle distance, so a query visits O(log n) nodes.
+
+The bundled centroid table is partial: a curated subset of 96 rows (Paris
+arrondissements, the communes our listings cover and the main French
+cities). Other postcodes are unknown until the full table, one row per
+commune and postcode, is built from the GeoNames French postal code dump
+(https://download.geonames.org/export/zip/FR.zip, CC BY 4.0), keeping the
+curated rows:
+
+    python -m app.services.geo FR.txt
+"""
+import argparse
+import csv
+import heapq
+import math
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from ..core.tracing import traced
+from .catalogue import DATA_DIR, Catalogue, get_catalogue, thaw
+
+
+CENTROIDS_PATH = DATA_DIR / "postcode_centroids.csv"
+CENTROID_FIELDS = ("postcode", "slug", "name", "lat", "lon")
+EARTH_RADIUS_KM = 6371.0
+
+POSTCODE_RE = re.compile(r"\b(\d{5})\b")
+ADDRESS_RE = re.compile(
+    r"\d+(?:\s?(?:bis|ter))?,?\s+"
+    r"(?:rue|av\.?|avenue|bd|boulevard|place|quai|all[ée]e|impasse|chemin|square|cit[ée]|villa|passage)\b"
+    r"[^,\n]*,\s*\d{5}(?:[ \t]+[^\W\d][\w' -]*)?",
+    re.IGNORECASE,
+)
+URL_CITY_RE = re.compile(r"doctolib\.fr/[^/]+/([^/?#]+)/")
+
+
+class Centroid(NamedTuple):
+    postcode: str
+    slug: str
+    name: str
+    lat: float
+    lon: float
+
+
+class Location(NamedTuple):
+    lat: float
+    lon: float
+    postcode: str
+    address: Optional[str]
+
+
+def slugify(text: str) -> str:
+    """Return the Doctolib-style slug of a city name ("Neuilly sur Seine" -> "neuilly-sur-seine")."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def load_centroids(path: Path = CENTROIDS_PATH) -> Tuple[Dict[str, Centroid], Dict[str, Centroid]]:
+    """
+    Read the centroid table and return it indexed by postcode and by city slug.
+
+    A postcode shared by several communes is placed at the mean of their
+    centroids; a slug shared by several communes keeps the first one.
+
+    :raises FileNotFoundError: If the table is missing.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Centroid table not found at path: {path}")
+
+    communes: Dict[str, List[Centroid]] = {}
+    by_slug: Dict[str, Centroid] = {}
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        for row in csv.DictReader(file):
+            centroid = Centroid(row["postcode"], row["slug"], row["name"], float(row["lat"]), float(row["lon"]))
+            communes.setdefault(centroid.postcode, []).append(centroid)
+            by_slug.setdefault(centroid.slug, centroid)
+
+    by_postcode = {
+        postcode: centroids[0]._replace(
+            lat=sum(c.lat for c in centroids) / len(centroids),
+            lon=sum(c.lon for c in centroids) / len(centroids),
+        )
+        for postcode, centroids in communes.items()
+    }
+    return by_postcode, by_slug
+
+
+def import_centroids(dump_path: Path, path: Path = CENTROIDS_PATH) -> Tuple[int, int]:
+    """
+    Rebuild the centroid table from a GeoNames postal code dump (``FR.txt``).
+
+    Rows of the current table come first and win over the dump for their
+    postcode; the dump adds one row per other postcode and commune. The
+    table is replaced atomically.
+
+    :return: (rows kept from the current table, rows added from the dump).
+    :raises ValueError: If a dump line is not a GeoNames postal code record.
+    """
+    rows = []
+    if path.exists():
+        with open(path, "r", encoding="utf-8", newline="") as file:
+            rows = [[row[field] for field in CENTROID_FIELDS] for row in csv.DictReader(file)]
+    kept = len(rows)
+    curated = {row[0] for row in rows}
+
+    # country, postcode, place, 6 admin columns, lat, lon, accuracy
+    seen = set()
+    with open(dump_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 11 or not POSTCODE_RE.fullmatch(fields[1]):
+                raise ValueError(f"{dump_path}:{line_number}: not a GeoNames postal code record")
+            postcode, name = fields[1], fields[2].strip()
+            slug = slugify(name)
+            if postcode in curated or (postcode, slug) in seen or not fields[9] or not fields[10]:
+                continue
+            seen.add((postcode, slug))
+            rows.append([postcode, slug, name, f"{float(fields[9]):.4f}", f"{float(fields[10]):.4f}"])
+
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=".centroids-", suffix=".csv")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(CENTROID_FIELDS)
+            writer.writerows(rows)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return kept, len(rows) - kept
+
+
+def _unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    """Return the point on the unit sphere; chord length orders points like great-circle distance."""
+    phi, lam = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def _chord_to_km(squared_chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(squared_chord) / 2))
+
+
+def locate_doctor(doctor: Mapping, by_postcode: Mapping[str, Centroid], by_slug: Mapping[str, Centroid]) -> Optional[Location]:
+    """Place a doctor from a postcode in its free text, else from its URL city."""
+    text = "\n".join(str(doctor.get(field) or "") for field in ("description", "contact_info", "expertise"))
+
+    for match in POSTCODE_RE.finditer(text):
+        centroid = by_postcode.get(match.group(1))
+        if centroid is not None:
+            address = next(
+                (m.group(0).strip() for m in ADDRESS_RE.finditer(text) if centroid.postcode in m.group(0)),
+                None,
+            )
+            return Location(centroid.lat, centroid.lon, centroid.postcode, address)
+
+    match = URL_CITY_RE.search(doctor.get("url") or "")
+    centroid = by_slug.get(match.group(1)) if match else None
+    if centroid is not None:
+        return Location(centroid.lat, centroid.lon, centroid.postcode, None)
+    return None
+
+
+# A KD-tree node: (point, doctor_id, axis, left, right).
+Node = Tuple[Tuple[float, float, float], str, int, Optional[tuple], Optional[tuple]]
+
+
+def _build_tree(points: List[Tuple[Tuple[float, float, float], str]], depth: int = 0) -> Optional[Node]:
+    if not points:
+        return None
+    axis = depth % 3
+    points.sort(key=lambda point: point[0][axis])
+    median = len(points) // 2
+    return (
+        points[median][0], points[median][1], axis,
+        _build_tree(points[:median], depth + 1),
+        _build_tree(points[median + 1:], depth + 1),
+    )
+
+
+class SpatialIndex:
+    """Per-specialty KD-trees of located doctors, built from one catalogue snapshot."""
+
+    def __init__(self, catalogue: Catalogue, by_postcode: Mapping[str, Centroid], by_slug: Mapping[str, Centroid]):
+        self.catalogue = catalogue
+        self.locations: Dict[str, Location] = {}
+        self.trees: Dict[str, Node] = {}
+
+        points = {}
+        for key, doctor in catalogue.doctors.items():
+            location = locate_doctor(doctor, by_postcode, by_slug)
+            if location is not None:
+                self.locations[key] = location
+                points[key] = _unit_vector(location.lat, location.lon)
+
+        for specialty, ids in catalogue.index.items():
+            tree = _build_tree([(points[key], key) for key in ids if key in points])
+            if tree is not None:
+                self.trees[specialty] = tree
+
+    def nearest(self, specialty: str, lat: float, lon: float, k: int) -> List[Tuple[float, str]]:
+        """Return ``(distance_km, doctor_id)`` of the ``k`` closest doctors, closest first."""
+        tree = self.trees.get(specialty)
+        if tree is None or k <= 0:
+            return []
+
+        target = _unit_vector(lat, lon)
+        best: List[Tuple[float, str]] = []  # max-heap on squared chord length
+
+        def visit(node: Optional[Node]) -> None:
+            if node is None:
+                return
+            point, key, axis, left, right = node
+            distance = sum((a - b) ** 2 for a, b in zip(point, target))
+            if len(best) < k:
+                heapq.heappush(best, (-distance, key))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, key))
+
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            # The other side can only hold closer points if the splitting plane is closer.
+            if len(best) < k or delta * delta < -best[0][0]:
+                visit(far)
+
+        visit(tree)
+        return sorted((_chord_to_km(-distance), key) for distance, key in best)
+
+
+_centroids: Optional[Tuple[Dict[str, Centroid], Dict[str, Centroid]]] = None
+_index: Optional[SpatialIndex] = None
+_lock = threading.Lock()
+
+
+def get_centroids() -> Tuple[Dict[str, Centroid], Dict[str, Centroid]]:
+    """Return the process-wide centroid table, loading it on first use."""
+    global _centroids
+    if _centroids is None:
+        with _lock:
+            if _centroids is None:
+                _centroids = load_centroids()
+    return _centroids
+
+
+def get_spatial_index() -> SpatialIndex:
+    """Return the spatial index of the current catalogue, rebuilding it after a reload."""
+    global _index
+    catalogue = get_catalogue()
+    index = _index
+    if index is None or index.catalogue is not catalogue:
+        by_postcode, by_slug = get_centroids()
+        with _lock:
+            if _index is None or _index.catalogue is not catalogue:
+                _index = SpatialIndex(catalogue, by_postcode, by_slug)
+            index = _index
+    return index
+
+
+def resolve_location(location: str) -> Tuple[float, float]:
+    """
+    Return the coordinates of a postcode or a city name.
+
+    :raises ValueError: If the location is not in the centroid table.
+    """
+    by_postcode, by_slug = get_centroids()
+    location = location.strip()
+
+    if POSTCODE_RE.fullmatch(location):
+        centroid = by_postcode.get(location)
+        if centroid is not None:
+            return centroid.lat, centroid.lon
+        # A guess from the other postcodes of the département could be tens of km off.
+        raise ValueError(f"Unknown postcode: {location} (try the city name)")
+    else:
+        centroid = by_slug.get(slugify(location))
+        if centroid is not None:
+            return centroid.lat, centroid.lon
+
+    raise ValueError(f"Unknown location: {location}")
+
+
+@traced("geo.nearest_doctors")
+def nearest_doctors(
+    specialty: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    postcode: Optional[str] = None,
+    k: int = 5,
+) -> List[dict]:
+    """
+    Retrieve the ``k`` doctors of a specialty closest to a point.
+
+    Parameters:
+        specialty (str): Doctolib specialty name.
+        lat, lon (float): Coordinates of the patient.
+        postcode (str): Postcode or city name, used when no coordinates are given.
+        k (int): Number of doctors to return.
+
+    Returns:
+        list: Doctor dictionaries closest first, each with "distance_km",
+              "postcode" and, when found in its listing, "address".
+
+    Raises:
+        ValueError: If neither coordinates nor a known postcode are given.
+    """
+    if lat is None or lon is None:
+        if not postcode:
+            raise ValueError("Either lat and lon or a postcode is required")
+        lat, lon = resolve_location(postcode)
+
+    index = get_spatial_index()
+    results = []
+    for distance, key in index.nearest(specialty.strip(), lat, lon, k):
+        location = index.locations[key]
+        results.append({
+            **thaw(index.catalogue.doctors[key]),
+            "distance_km": round(distance, 2),
+            "postcode": location.postcode,
+            "address": location.address,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the postcode centroid table from a GeoNames dump")
+    parser.add_argument("path", help="GeoNames postal code file, e.g. FR.txt from FR.zip")
+    parser.add_argument("--output", type=Path, default=CENTROIDS_PATH)
+    args = parser.parse_args()
+
+    kept, added = import_centroids(Path(args.path), args.output)
+    print(f"Wrote {kept + added} centroids to {args.output} ({kept} kept, {added} from the dump)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Streaming ingestion of Doctolib doctor data into the doctor store.
+
+Accepts either NDJSON (one raw doctor per line, with its specialty under
+"specialite" or "specialty") or a JSON object grouped by specialty, like
+grouped_by_specialite.json. Both are parsed incrementally, standardized with
+``standardize_doctor`` and upserted in bounded batches, so memory does not
+grow with the input size. Running processes pick the new version up through
+``catalogue.get_catalogue``.
+
+The whole ingestion is one transaction: it is published at the end, or not
+at all if the input is unreadable. Records that are not JSON objects, or NDJSON
+lines without a specialty, are skipped with a warning.
+
+    python -m app.services.ingest path/to/doctors.ndjson
+"""
+import argparse
+import json
+import logging
+from typing import IO, Iterator, Set, Tuple
+
+from .doctolib import standardize_doctor
+from .doctor_store import DoctorStore, doctor_store
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 1000
+
+_decoder = json.JSONDecoder()
+
+
+def iter_ndjson(file: IO[str]) -> Iterator[Tuple[str, dict]]:
+    """Yield (specialty, raw doctor) pairs from an NDJSON stream."""
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            doctor = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning("Skipping line %d: invalid JSON (%s)", line_number, e)
+            continue
+        if not isinstance(doctor, dict):
+            logger.warning("Skipping line %d: not a JSON object", line_number)
+            continue
+        specialty = doctor.pop("specialite", None) or doctor.pop("specialty", None)
+        if not isinstance(specialty, str) or not specialty.strip():
+            logger.warning("Skipping line %d: missing 'specialite' or 'specialty'", line_number)
+            continue
+        yield specialty.strip(), doctor
+
+
+class _StreamReader:
+    """Chunked buffer over a text stream with just enough JSON tokenizing."""
+
+    def __init__(self, file: IO[str], chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer only holds the current value.
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}, found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_grouped_json(file: IO[str]) -> Iterator[Tuple[str, dict]]:
+    """Yield (specialty, raw doctor) pairs from a {specialty: [doctors]} JSON stream."""
+    reader = _StreamReader(file)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        specialty = reader.value()
+        reader.expect(":")
+        reader.expect("[")
+        if reader.peek() == "]":
+            reader.pos += 1
+        else:
+            position = 0
+            while True:
+                doctor = reader.value()
+                if isinstance(doctor, dict):
+                    yield specialty.strip(), doctor
+                else:
+                    logger.warning("Skipping %s record %d: not a JSON object", specialty, position)
+                position += 1
+                if reader.peek() == "]":
+                    reader.pos += 1
+                    break
+                reader.expect(",")
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
+
+
+def ingest(
+    file: IO[str],
+    input_format: str = "ndjson",
+    store: DoctorStore = doctor_store,
+    batch_size: int = BATCH_SIZE,
+    replace: bool = False
+) -> Tuple[int, Set[str], int]:
+    """
+    Standardize and upsert every doctor of a stream into the store.
+
+    :param file: Text stream to read from.
+    :param input_format: "ndjson" or "json" (grouped by specialty).
+    :param replace: Drop the doctors of every specialty in the input that the
+        input does not list, e.g. for a full re-export.
+    :return: (number of records, specialties touched, new store version).
+    :raises ValueError: If the input is not valid JSON; nothing is written.
+    """
+    records = iter_ndjson(file) if input_format == "ndjson" else iter_grouped_json(file)
+    specialties: Set[str] = set()
+    batch = []
+    count = 0
+
+    try:
+        for specialty, doctor in records:
+            if replace and specialty not in specialties:
+                # Its rows are still in this batch or later ones, never earlier.
+                store.clear_partition(specialty)
+            batch.append((specialty, standardize_doctor(doctor)))
+            specialties.add(specialty)
+            count += 1
+            if len(batch) >= batch_size:
+                store.upsert(batch)
+                batch = []
+
+        if batch:
+            store.upsert(batch)
+    except BaseException:
+        store.rollback()
+        raise
+
+    version = store.commit_partitions(specialties) if specialties else store.version()
+    return count, specialties, version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest Doctolib doctors into the doctor store")
+    parser.add_argument("path", help="NDJSON file, or JSON grouped by specialty")
+    parser.add_argument("--format", choices=["ndjson", "json"],
+                        help="Input format (default: guessed from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--replace", action="store_true",
+                        help="Drop the doctors of the input's specialties that it does not list")
+    parser.add_argument("--store", help="Doctor store path (default: DOCTOR_STORE_PATH)")
+    args = parser.parse_args()
+
+    input_format = args.format or ("json" if args.path.endswith(".json") else "ndjson")
+    store = DoctorStore(args.store) if args.store else doctor_store
+
+    with open(args.path, "r", encoding="utf-8") as file:
+        count, specialties, version = ingest(file, input_format, store, args.batch_size, args.replace)
+    print(f"Ingested {count} doctors into {len(specialties)} partitions, store version {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,17 @@ import base64
 import json
 import os
 import backend.app.config as settings
+from ..core.shared_cache import shared_cache
+from ..core.tracing import span, traced
+from .catalogue import get_catalogue, thaw
 
 
+# Margin kept before the Priaid token expiry so a cached token is never sent stale.
+TOKEN_EXPIRY_MARGIN = 60
+SPECIALISATIONS_CACHE_TTL = 24 * 60 * 60
+
+
+@traced("medical_api.get_access_token")
 def get_access_token(api_key: str, secret_key: str, response_format: str = "json") -> dict:
     """
     Fetch the access token from the authorization service using HMACMD5 authentication.
@@ -16,6 +25,11 @@ def get_access_token(api_key: str, secret_key: str, response_format: str = "json
     :param response_format: The format for the returned data (json or xml). Default is "json".
     :return: A dictionary with the token information.
     """
+    cache_key = f"priaid:token:{api_key}:{response_format}"
+    cached = shared_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     # Build the URL with the optional format parameter
     uri = f"https://authservice.priaid.ch/login?format={response_format}"
     
@@ -29,32 +43,36 @@ def get_access_token(api_key: str, secret_key: str, response_format: str = "json
     }
     
     # Make the POST request (empty body)
-    response = requests.post(uri, headers=headers)
+    with span("priaid.http", endpoint="login"):
+        response = requests.post(uri, headers=headers)
     response.raise_for_status()  # Raise exception if an error occurred
     
+    token_data = response.json()
+    ttl = token_data.get("ValidThrough", 0) - TOKEN_EXPIRY_MARGIN
+    if ttl > 0:
+        shared_cache.set(cache_key, token_data, ttl)
+
     # Return the JSON response containing the token details
-    return response.json()
+    return token_data
 
-def get_symptoms() -> list:
+@traced("medical_api.get_symptoms")
+def get_symptoms(language: str = "en-gb") -> list:
     """
-    Load the list of symptoms from a local JSON file.
+    Return the list of symptoms from the local catalogue.
 
-    This function reads the symptoms data from the JSON file located at
-    "app/services/symptoms.json" and returns it as a list.
+    The symptoms are read once from "app/services/symptoms.json" and its
+    per-language siblings ("symptoms.<language>.json") into the shared
+    read-only catalogue; each call returns fresh copies.
 
+    :param language: Priaid language code of the names, e.g. "fr-fr".
     :return: A list of symptoms, where each symptom is represented as a dictionary.
     :raises FileNotFoundError: If the symptoms file is not found at the specified path.
     :raises json.JSONDecodeError: If the file content is not valid JSON.
+    :raises ValueError: If there is no snapshot for the language.
     """
-    file_path = "backend/app/services/symptoms.json"
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Symptoms file not found at path: {file_path}")
-    
-    with open(file_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
-    
-    return data
+    return [thaw(symptom) for symptom in get_catalogue().symptom_snapshots.symptoms(language)]
 
+@traced("medical_api.get_specialisations")
 def get_specialisations(
     symptoms: list[int],
     gender: str,
@@ -73,6 +91,32 @@ def get_specialisations(
     Returns:
         list: A list of specialisation dictionaries, each containing an "ID", "Name", and "Accuracy".
 
+    Raises:
+        HTTPError: If the API call fails with a non-200 status code.
+    """
+    cache_key = "priaid:specialisations:{}:{}:{}:{}:{}".format(
+        json.dumps(sorted(symptoms)), gender, year_of_birth, language, response_format
+    )
+    cached = shared_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    data = fetch_specialisations(symptoms, gender, year_of_birth, language, response_format)
+    shared_cache.set(cache_key, data, SPECIALISATIONS_CACHE_TTL)
+    return data
+
+def fetch_specialisations(
+    symptoms: list[int],
+    gender: str,
+    year_of_birth: int,
+    language: str = "en-gb",
+    response_format: str = "json"
+) -> list:
+    """
+    Call the Priaid specialisations endpoint, bypassing the shared cache.
+
+    Takes the parameters of get_specialisations.
+
     Raises:
         HTTPError: If the API call fails with a non-200 status code.
     """
@@ -81,7 +125,7 @@ def get_specialisations(
     
     if not api_key or not secret_key:
         raise ValueError("API_KEY_MEDICAL_API and SECRET_KEY_MEDICAL_API must be set as environment variables.")
-    
+
     token = get_access_token(api_key, secret_key)["Token"]
     url = "https://healthservice.priaid.ch/diagnosis/specialisations"
     
@@ -95,7 +139,7 @@ def get_specialisations(
         "format": response_format,
     }
     
-    response = requests.get(url, params=params)
+    with span("priaid.http", endpoint="diagnosis/specialisations"):
+        response = requests.get(url, params=params)
     response.raise_for_status()
-    
     return response.json()
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Local extraction of Priaid symptoms from a free-text complaint.
+
+"j'ai mal au ventre et je suis très agité" -> Abdominal pain, Agitation,
+without an LLM round trip or a symptom dump in the prompt.
+
+Every symptom name, in every language snapshot, and every FR/EN synonym of
+``symptom_synonyms.json`` is a row of a character 3-gram TF-IDF matrix, built
+once per process. The matrix is stored column-wise as postings (n-gram ->
+[(row, weight)]), so scoring a span against all rows is one sparse
+matrix-vector product that only touches the rows sharing an n-gram with it.
+Candidate spans are runs of up to ``MAX_SPAN_WORDS`` words inside a clause;
+the best non-overlapping matches are returned with their cosine similarity as
+confidence.
+
+Denied symptoms are left out: a span is negated when a negation cue ("no",
+"don't", "without", "pas", "sans", ...) comes before it in its clause, or when
+it contains a cue that the matched name does not ("no fever" is not "Fever",
+while "not hungry" is a synonym of "Reduced appetite"). A negation carries
+over "or": "no fever or cough" denies both.
+"""
+import json
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from ..core.tracing import traced
+from .catalogue import DATA_DIR, get_catalogue
+
+
+SYNONYMS_PATH = DATA_DIR / "symptom_synonyms.json"
+NGRAM_SIZE = 3
+MAX_SPAN_WORDS = 5
+MIN_CONFIDENCE = 0.8
+
+# Function words dropped from names, synonyms and complaints alike. Negations
+# are kept: "not hungry" must not match "hungry".
+STOPWORDS = frozenset("""
+a am an are at be been days do does feel feeling get got had has have i im is it its ll lot
+me my of on really since so the to today ve very yesterday
+ai au aux avec beaucoup c ca ce d de depuis des du en est hier il j je jours l la le les m ma
+mes mon n qu s sa se ses son suis sur t ta te tres trop tu un une vraiment y
+""".split())
+# Words that end a clause: a span never straddles two complaints.
+CONJUNCTIONS = frozenset("and but or then also et mais ou puis aussi".split())
+# Conjunctions that keep the negation of the previous clause going.
+DISJUNCTIONS = frozenset("or ou".split())
+# "don't" is split into "don" and the stopword "t".
+NEGATIONS = frozenset("""
+no not don doesn didn haven hasn isn aren never none nor without
+pas sans ni aucun aucune jamais
+""".split())
+CLAUSE_BREAK_RE = re.compile(r"[.,;:!?()\n]")
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize_word(word: str) -> str:
+    """Casefold and strip accents ("Agité" -> "agite")."""
+    word = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(char for char in word if not unicodedata.combining(char))
+
+
+def _terms(text: str) -> List[str]:
+    """Return the normalized words of a phrase, without stopwords."""
+    words = (normalize_word(word) for word in WORD_RE.findall(text))
+    return [word for word in words if word not in STOPWORDS]
+
+
+def _ngrams(word: str) -> Iterable[str]:
+    padded = f" {word} "
+    return (padded[i:i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1)))
+
+
+def load_synonyms(path: Path = SYNONYMS_PATH) -> Dict[int, List[str]]:
+    """
+    Read the bundled synonym list, keyed by symptom ID, all languages merged.
+
+    :raises FileNotFoundError: If the list is missing.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Synonym list not found at path: {path}")
+
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    return {
+        int(symptom_id): [phrase for phrases in by_language.values() for phrase in phrases]
+        for symptom_id, by_language in data.items()
+    }
+
+
+class SymptomExtractor:
+    """Character n-gram TF-IDF matcher over symptom names and synonyms."""
+
+    def __init__(self, symptoms: Sequence[Mapping], synonyms: Optional[Mapping[int, Iterable[str]]] = None):
+        self.names: Dict[int, str] = {symptom["ID"]: symptom["Name"] for symptom in symptoms}
+
+        phrases = [(symptom_id, name) for symptom_id, name in self.names.items()]
+        for symptom_id, extra in (synonyms or {}).items():
+            if symptom_id in self.names:
+                phrases.extend((symptom_id, phrase) for phrase in extra)
+
+        counts = []
+        self.row_symptoms: List[int] = []
+        self.row_negations: List[bool] = []
+        seen = set()
+        for symptom_id, phrase in phrases:
+            terms = tuple(_terms(phrase))
+            if not terms or (symptom_id, terms) in seen:
+                continue
+            seen.add((symptom_id, terms))
+            counts.append(Counter(gram for term in terms for gram in _ngrams(term)))
+            self.row_symptoms.append(symptom_id)
+            self.row_negations.append(any(term in NEGATIONS for term in terms))
+
+        document_frequency = Counter(gram for row in counts for gram in row)
+        rows = len(counts)
+        self.idf = {
+            gram: math.log((1 + rows) / (1 + df)) + 1 for gram, df in document_frequency.items()
+        }
+        # N-grams never seen in a row still weigh in the query norm, so that
+        # unrelated words lower the similarity instead of being ignored.
+        self.unknown_idf = math.log(1 + rows) + 1
+
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for row, grams in enumerate(counts):
+            weights = {gram: count * self.idf[gram] for gram, count in grams.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            for gram, weight in weights.items():
+                postings[gram].append((row, weight / norm))
+        self.postings = {gram: tuple(entries) for gram, entries in postings.items()}
+
+        self._word_scores = lru_cache(maxsize=8192)(self._score_word)
+
+    def _score_word(self, word: str) -> Tuple[Dict[str, float], Dict[int, float]]:
+        """Return the TF-IDF vector of a word and its dot product with every row it touches."""
+        vector = {
+            gram: count * self.idf.get(gram, self.unknown_idf)
+            for gram, count in Counter(_ngrams(word)).items()
+        }
+        dots: Dict[int, float] = defaultdict(float)
+        for gram, weight in vector.items():
+            for row, row_weight in self.postings.get(gram, ()):
+                dots[row] += weight * row_weight
+        return vector, dict(dots)
+
+    def _clauses(self, text: str) -> List[List[Tuple[str, int, int, bool]]]:
+        """
+        Split a complaint into clauses of (normalized word, start, end, negated),
+        ``negated`` being whether a negation cue comes before the word.
+        """
+        clauses, current, last_end = [], [], 0
+        negated = False
+        for match in WORD_RE.finditer(text):
+            word = normalize_word(match.group(0))
+            punctuation = CLAUSE_BREAK_RE.search(text, last_end, match.start())
+            if punctuation or word in CONJUNCTIONS:
+                if current:
+                    clauses.append(current)
+                current = []
+                negated = negated and not punctuation and word in DISJUNCTIONS
+            last_end = match.end()
+            if word not in STOPWORDS and word not in CONJUNCTIONS:
+                current.append((word, match.start(), match.end(), negated))
+                negated = negated or word in NEGATIONS
+        if current:
+            clauses.append(current)
+        return clauses
+
+    def extract(self, text: str, limit: int = 5, min_confidence: float = MIN_CONFIDENCE) -> List[dict]:
+        """
+        Return the symptoms mentioned in ``text``, most confident first.
+
+        Each result is {"ID", "Name", "confidence", "text"}, ``text`` being the
+        matched part of the complaint. A part of the complaint matches at most
+        one symptom. Negated mentions ("no fever", "sans fièvre") are left out.
+        """
+        candidates = []
+        for clause in self._clauses(text):
+            for first in range(len(clause)):
+                if clause[first][3]:
+                    # Every later span of the clause is negated.
+                    break
+                vector: Dict[str, float] = {}
+                squared_norm = 0.0
+                dots: Dict[int, float] = defaultdict(float)
+                has_negation = False
+                for last in range(first, min(len(clause), first + MAX_SPAN_WORDS)):
+                    has_negation = has_negation or clause[last][0] in NEGATIONS
+                    word_vector, word_dots = self._word_scores(clause[last][0])
+                    for gram, weight in word_vector.items():
+                        previous = vector.get(gram, 0.0)
+                        vector[gram] = previous + weight
+                        squared_norm += (previous + weight) ** 2 - previous ** 2
+                    for row, dot in word_dots.items():
+                        dots[row] += dot
+
+                    norm = math.sqrt(squared_norm)
+                    best: Dict[int, float] = {}
+                    for row, dot in dots.items():
+                        if has_negation and not self.row_negations[row]:
+                            continue
+                        score = dot / norm
+                        symptom_id = self.row_symptoms[row]
+                        if score >= min_confidence and score > best.get(symptom_id, 0.0):
+                            best[symptom_id] = score
+                    for symptom_id, score in best.items():
+                        candidates.append((score, last - first, symptom_id, clause[first][1], clause[last][2]))
+
+        # Greedy selection: most confident (then longest) span first.
+        candidates.sort(key=lambda candidate: (-candidate[0], -candidate[1]))
+        results, taken = [], []
+        for score, _, symptom_id, start, end in candidates:
+            if len(results) >= limit:
+                break
+            if symptom_id in (result["ID"] for result in results):
+                continue
+            if any(start < taken_end and taken_start < end for taken_start, taken_end in taken):
+                continue
+            taken.append((start, end))
+            results.append({
+                "ID": symptom_id,
+                "Name": self.names[symptom_id],
+                "confidence": round(min(score, 1.0), 3),
+                "text": text[start:end],
+            })
+        return results
+
+
+_extractor: Optional[SymptomExtractor] = None
+_lock = threading.Lock()
+
+
+def get_extractor() -> SymptomExtractor:
+    """Return the process-wide extractor, building it on first use."""
+    global _extractor
+    if _extractor is None:
+        with _lock:
+            if _extractor is None:
+                snapshots = get_catalogue().symptom_snapshots
+                synonyms = load_synonyms()
+                for symptom_id, names in snapshots.names.items():
+                    synonyms.setdefault(symptom_id, []).extend(names.values())
+                _extractor = SymptomExtractor(snapshots.symptoms(), synonyms)
+    return _extractor
+
+
+@traced("symptom_extractor.extract_symptoms")
+def extract_symptoms(
+    text: str,
+    limit: int = 5,
+    min_confidence: float = MIN_CONFIDENCE,
+    language: str = "en-gb"
+) -> List[dict]:
+    """
+    Extract Priaid symptoms from a free-text complaint, in French or English.
+
+    Parameters:
+        text (str): The patient's own words, e.g. "j'ai mal au ventre et je suis très agité".
+        limit (int): Maximum number of symptoms to return.
+        min_confidence (float): Minimum cosine similarity, between 0 and 1.
+        language (str): Language of the returned names, e.g. "fr-fr".
+
+    Returns:
+        list: {"ID", "Name", "confidence", "text"} dictionaries, most confident first.
+
+    Raises:
+        ValueError: If there is no snapshot for the language.
+    """
+    snapshots = get_catalogue().symptom_snapshots
+    snapshots.check_language(language)
+    results = get_extractor().extract(text, limit, min_confidence)
+    for result in results:
+        result["Name"] = snapshots.name(result["ID"], language)
+    return results
@@ -0,0 +1,218 @@
+"""
+Per-language snapshots of the Priaid symptom catalogue.
+
+Priaid serves the same symptom IDs in every language. The English snapshot is
+``symptoms.json``; the others live next to it as ``symptoms.<language>.json``
+(e.g. ``symptoms.fr-fr.json``) and are imported from offline dumps of the
+Priaid ``/symptoms`` endpoint:
+
+    python -m app.services.symptom_snapshots fr-fr path/to/symptoms_fr.json
+
+A language without an imported snapshot may ship a hand-made stopgap as
+``symptoms.<language>.fallback.json``, used until the real one is imported.
+
+Every snapshot is loaded once into ``SymptomSnapshots``, keyed by symptom ID,
+with a single name index spanning all languages: "Fièvre" and "Fever" resolve
+to the same ID and names are rendered locally in the session's language.
+Servers pick up a newly imported language on restart.
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import unicodedata
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Not imported from .catalogue, which builds on this module.
+DATA_DIR = Path(__file__).parent
+DEFAULT_LANGUAGE = "en-gb"
+LANGUAGE_RE = re.compile(r"[a-z]{2}-[a-z]{2}")
+
+
+def snapshot_path(language: str, data_dir: Path = DATA_DIR) -> Path:
+    """Return the path of a language's snapshot."""
+    if language == DEFAULT_LANGUAGE:
+        return data_dir / "symptoms.json"
+    return data_dir / f"symptoms.{language}.json"
+
+
+def fallback_path(language: str, data_dir: Path = DATA_DIR) -> Path:
+    """Return the path of a language's hand-made stopgap snapshot."""
+    return data_dir / f"symptoms.{language}.fallback.json"
+
+
+def available_languages(data_dir: Path = DATA_DIR) -> Tuple[str, ...]:
+    """Return the languages with a snapshot or a fallback in ``data_dir``, the default one first."""
+    languages = {
+        path.name[len("symptoms."):-len(".json")].replace(".fallback", "", 1)
+        for path in data_dir.glob("symptoms.*.json")
+    }
+    return (DEFAULT_LANGUAGE, *sorted(
+        language for language in languages if LANGUAGE_RE.fullmatch(language) and language != DEFAULT_LANGUAGE
+    ))
+
+
+def normalize_name(name: str) -> str:
+    """Casefold, strip accents and collapse punctuation ("Fièvre " -> "fievre")."""
+    name = unicodedata.normalize("NFKD", name.casefold())
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", name))
+
+
+class SymptomSnapshots:
+    """
+    Immutable symptom catalogue in every supported language.
+
+    ``names`` maps each symptom ID to its name per language and ``ids`` maps
+    the normalized name of a symptom, in any language, to its ID.
+    """
+    __slots__ = ("languages", "records", "names", "ids")
+
+    def __init__(self, snapshots: Mapping[str, Sequence[Mapping]]):
+        if DEFAULT_LANGUAGE not in snapshots:
+            raise ValueError(f"Missing the {DEFAULT_LANGUAGE} snapshot")
+
+        self.languages = (DEFAULT_LANGUAGE, *(language for language in snapshots if language != DEFAULT_LANGUAGE))
+
+        names: Dict[int, Dict[str, str]] = {}
+        for language in self.languages:
+            for symptom in snapshots[language]:
+                if language == DEFAULT_LANGUAGE or symptom["ID"] in names:
+                    names.setdefault(symptom["ID"], {})[language] = symptom["Name"]
+        self.names = MappingProxyType({
+            symptom_id: MappingProxyType(by_language) for symptom_id, by_language in names.items()
+        })
+
+        # Every language lists the symptoms in the order of the default snapshot.
+        order = [symptom["ID"] for symptom in snapshots[DEFAULT_LANGUAGE]]
+        self.records = MappingProxyType({
+            language: tuple(
+                MappingProxyType({"ID": symptom_id, "Name": names[symptom_id].get(language, names[symptom_id][DEFAULT_LANGUAGE])})
+                for symptom_id in order
+            )
+            for language in self.languages
+        })
+
+        ids: Dict[str, int] = {}
+        for language in self.languages:
+            for symptom_id, by_language in names.items():
+                if language in by_language:
+                    ids.setdefault(normalize_name(by_language[language]), symptom_id)
+        self.ids = MappingProxyType(ids)
+
+    def check_language(self, language: str) -> None:
+        """
+        :raises ValueError: If there is no snapshot for the language.
+        """
+        if language not in self.records:
+            raise ValueError(f"Unsupported language: {language} (available: {', '.join(self.languages)})")
+
+    def symptoms(self, language: str = DEFAULT_LANGUAGE) -> Tuple[Mapping, ...]:
+        """
+        Return the symptoms as {"ID", "Name"} records in ``language``.
+
+        :raises ValueError: If there is no snapshot for the language.
+        """
+        self.check_language(language)
+        return self.records[language]
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Return the ID of a symptom named ``name`` in any language, or None."""
+        return self.ids.get(normalize_name(name))
+
+    def name(self, symptom_id: int, language: str = DEFAULT_LANGUAGE) -> Optional[str]:
+        """Return the name of a symptom in ``language``, else in the default language."""
+        by_language = self.names.get(symptom_id)
+        if by_language is None:
+            return None
+        return by_language.get(language, by_language[DEFAULT_LANGUAGE])
+
+
+def _read_snapshot(path: Path) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as file:
+        symptoms = json.load(file)
+    if not isinstance(symptoms, list):
+        raise ValueError(f"{path}: expected a list of symptoms")
+    for position, symptom in enumerate(symptoms):
+        if not isinstance(symptom, dict) or not isinstance(symptom.get("ID"), int) or not symptom.get("Name"):
+            raise ValueError(f"{path}: entry {position} is not an {{\"ID\", \"Name\"}} symptom")
+    return symptoms
+
+
+def load_snapshots(data_dir: Path = DATA_DIR, default_path: Optional[Path] = None) -> SymptomSnapshots:
+    """
+    Load every snapshot of ``data_dir``, or its fallback if not imported yet.
+
+    :param default_path: Default-language snapshot, if not the one of ``data_dir``.
+    :raises FileNotFoundError: If the default-language snapshot is missing.
+    """
+    default_path = default_path or snapshot_path(DEFAULT_LANGUAGE, data_dir)
+    if not default_path.exists():
+        raise FileNotFoundError(f"Catalogue file not found at path: {default_path}")
+
+    snapshots = {DEFAULT_LANGUAGE: _read_snapshot(default_path)}
+    for language in available_languages(data_dir)[1:]:
+        path = snapshot_path(language, data_dir)
+        snapshots[language] = _read_snapshot(path if path.exists() else fallback_path(language, data_dir))
+    return SymptomSnapshots(snapshots)
+
+
+def import_snapshot(dump_path: Path, language: str, data_dir: Path = DATA_DIR) -> Tuple[int, List[int], List[int]]:
+    """
+    Write the snapshot of a language from an offline dump of Priaid's ``/symptoms``.
+
+    Other languages keep the order and the IDs of the default-language
+    snapshot: IDs it does not know are ignored and missing ones are rendered
+    in the default language. The snapshot is replaced atomically.
+
+    :return: (symptoms written, IDs missing from the dump, IDs ignored).
+    :raises ValueError: If the language code or the dump is invalid.
+    """
+    if not LANGUAGE_RE.fullmatch(language):
+        raise ValueError(f"Invalid language code: {language} (expected e.g. fr-fr)")
+
+    dump = _read_snapshot(dump_path)
+    names = {symptom["ID"]: symptom["Name"].strip() for symptom in dump}
+    known = [symptom["ID"] for symptom in _read_snapshot(snapshot_path(DEFAULT_LANGUAGE, data_dir))]
+    missing = [symptom_id for symptom_id in known if symptom_id not in names]
+
+    if language == DEFAULT_LANGUAGE:
+        # The default language is the reference: the dump replaces it as-is.
+        symptoms = [{"ID": symptom_id, "Name": name} for symptom_id, name in names.items()]
+        ignored: List[int] = []
+    else:
+        symptoms = [{"ID": symptom_id, "Name": names[symptom_id]} for symptom_id in known if symptom_id in names]
+        ignored = sorted(set(names) - set(known))
+
+    path = snapshot_path(language, data_dir)
+    descriptor, temporary = tempfile.mkstemp(dir=data_dir, prefix=".symptoms-", suffix=".json")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(symptoms, file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return len(symptoms), missing, ignored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a Priaid symptom dump as a language snapshot")
+    parser.add_argument("language", help="Priaid language code, e.g. fr-fr")
+    parser.add_argument("path", help="JSON list of {\"ID\", \"Name\"} symptoms")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = parser.parse_args()
+
+    count, missing, ignored = import_snapshot(Path(args.path), args.language, args.data_dir)
+    print(f"Wrote {count} {args.language} symptoms to {snapshot_path(args.language, args.data_dir)}")
+    if missing:
+        print(f"Missing from the dump: {', '.join(map(str, missing))}")
+    if ignored:
+        print(f"Ignored, unknown in {DEFAULT_LANGUAGE}: {', '.join(map(str, ignored))}")
+
+
+if __name__ == "__main__":
+    main()
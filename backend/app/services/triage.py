@@ -0,0 +1,114 @@
+"""
+Server-side triage pipeline: symptoms -> specialisations -> doctors.
+
+Collapses the get_symptoms / get_specializations /
+get_doctolib_specialisations / get_doctors tool round trips into one call.
+"""
+import asyncio
+from datetime import date
+from typing import Callable, List, Tuple, Union
+
+from ..core.tracing import traced
+from .catalogue import get_catalogue
+from .doctolib import get_doctors, map_specialisations
+from .medical_api import get_specialisations
+
+
+# Used when none of the recommended specialisations exist on Doctolib.
+FALLBACK_SPECIALTY = "Médecin généraliste"
+# Priaid is always queried in English: PRIAID_TO_DOCTOLIB is keyed on its English names.
+PRIAID_LANGUAGE = "en-gb"
+
+
+def resolve_symptoms(
+    symptoms: List[Union[int, str]],
+    language: str = "en-gb"
+) -> Tuple[List[dict], List[str]]:
+    """
+    Resolve symptom IDs or names against the local symptom catalogue.
+
+    Parameters:
+        symptoms (list): Symptom IDs (int or numeric str) or names in any
+            supported language, case- and accent-insensitive.
+        language (str): Language of the returned names; English if there is
+            no snapshot for it.
+
+    Returns:
+        tuple: (matched symptoms as {"ID", "Name"} dictionaries, unresolved inputs).
+    """
+    snapshots = get_catalogue().symptom_snapshots
+
+    matched, unknown = [], []
+    for value in symptoms:
+        text = str(value).strip()
+        symptom_id = int(text) if text.isdigit() else snapshots.resolve(text)
+        name = snapshots.name(symptom_id, language) if symptom_id is not None else None
+        if name is None:
+            unknown.append(text)
+        elif all(symptom["ID"] != symptom_id for symptom in matched):
+            matched.append({"ID": symptom_id, "Name": name})
+    return matched, unknown
+
+
+@traced("triage.triage")
+async def triage(
+    symptoms: List[Union[int, str]],
+    age: int,
+    gender: str,
+    max_specialties: int = 3,
+    doctors_per_specialty: int = 5,
+    language: str = "en-gb",
+    fetch_specialisations: Callable = get_specialisations
+) -> dict:
+    """
+    Run the whole triage in one call.
+
+    Parameters:
+        symptoms (list): Symptom IDs or names, in any supported language.
+        age (int): Patient's age.
+        gender (str): "male" or "female".
+        max_specialties (int): Number of Doctolib specialties to return doctors for.
+        doctors_per_specialty (int): Maximum number of doctors per specialty.
+        language (str): Language of the symptom names, with a symptom snapshot.
+            Specialisations are always named in English.
+        fetch_specialisations (callable): Priaid client, replaced by fakes in replays.
+
+    Returns:
+        dict: {"symptoms", "unknown_symptoms", "specialisations", "doctors"} where
+              "doctors" maps each selected Doctolib specialty to its doctors.
+
+    Raises:
+        ValueError: If the language is not supported or no symptom could be resolved.
+        HTTPError: If the Priaid call fails.
+    """
+    get_catalogue().symptom_snapshots.check_language(language)
+    matched, unknown = resolve_symptoms(symptoms, language)
+    if not matched:
+        raise ValueError(f"No known symptom in: {', '.join(unknown)}")
+
+    year_of_birth = date.today().year - age
+    specialisations = await asyncio.to_thread(
+        fetch_specialisations, [symptom["ID"] for symptom in matched], gender, year_of_birth,
+        language=PRIAID_LANGUAGE
+    )
+    specialisations = sorted(
+        specialisations, key=lambda specialisation: specialisation.get("Accuracy", 0), reverse=True
+    )
+
+    specialties = map_specialisations(
+        [specialisation.get("Name", "") for specialisation in specialisations]
+    )[:max_specialties] or [FALLBACK_SPECIALTY]
+
+    doctor_lists = await asyncio.gather(*[
+        asyncio.to_thread(get_doctors, specialty) for specialty in specialties
+    ])
+
+    return {
+        "symptoms": matched,
+        "unknown_symptoms": unknown,
+        "specialisations": specialisations,
+        "doctors": {
+            specialty: doctors[:doctors_per_specialty]
+            for specialty, doctors in zip(specialties, doctor_lists)
+        },
+    }
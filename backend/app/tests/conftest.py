@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Tests import both ``backend.app.*`` (agent side) and the services directly.
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT))
+
+_tmp = tempfile.mkdtemp(prefix="medical-research-tests-")
+os.environ.setdefault("API_KEY_MEDICAL_API", "test")
+os.environ.setdefault("SECRET_KEY_MEDICAL_API", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ["SHARED_CACHE_PATH"] = os.path.join(_tmp, "shared_cache.sqlite3")
+# No store: the catalogue is built from the bundled JSON files.
+os.environ["DOCTOR_STORE_PATH"] = os.path.join(_tmp, "doctors.sqlite3")
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from backend.app.core.admission import (
+    AdaptiveLimiter,
+    AdmissionControlMiddleware,
+    AdmissionController,
+    ClientQuota,
+    Saturated,
+)
+
+
+def test_limit_grows_up_to_max_limit():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, target_latency=1.0)
+
+    async def run():
+        for _ in range(200):
+            await limiter.acquire()
+            limiter.release(latency=0.01)
+
+    asyncio.run(run())
+    assert limiter.limit == 4
+
+
+def test_initial_limit_is_clamped_to_max_limit():
+    assert AdaptiveLimiter(initial_limit=32, max_limit=16).limit == 16
+
+
+def test_slow_or_failed_requests_back_off():
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, target_latency=1.0, backoff=0.5)
+
+    async def run():
+        await limiter.acquire()
+        limiter.release(latency=5.0)
+        await limiter.acquire()
+        limiter.release(latency=0.01, failed=True)
+        for _ in range(5):
+            await limiter.acquire()
+            limiter.release(latency=5.0)
+
+    asyncio.run(run())
+    assert limiter.limit == 2
+
+
+def test_queued_request_gets_the_released_slot():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=4, queue_timeout=1.0)
+
+    async def run():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limiter.release(latency=0.01)
+        await waiter
+        return limiter.inflight
+
+    assert asyncio.run(run()) == 1
+    assert limiter.stats["queued"] == 1
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=1, queue_timeout=1.0)
+
+    async def run():
+        await limiter.acquire()
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Saturated) as excinfo:
+            await limiter.acquire()
+        queued.cancel()
+        return excinfo.value
+
+    error = asyncio.run(run())
+    assert error.retry_after >= 1
+    assert limiter.stats["rejected"] == 1
+
+
+def test_queue_timeout_raises_saturated():
+    limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=0.01)
+
+    async def run():
+        await limiter.acquire()
+        with pytest.raises(Saturated):
+            await limiter.acquire()
+
+    asyncio.run(run())
+    assert limiter.stats["timed_out"] == 1
+    assert limiter.get_stats()["waiting"] == 0
+
+
+def test_client_quota_allows_burst_then_rejects():
+    quota = ClientQuota(rate=1.0, burst=2)
+
+    assert quota.take("a") is None
+    assert quota.take("a") is None
+    assert quota.take("a") >= 1
+    assert quota.take("b") is None
+
+
+def test_spoofed_forwarded_for_does_not_change_the_bucket():
+    controller = AdmissionController()
+    controller.protect("/api", AdaptiveLimiter(), ClientQuota(rate=0.001, burst=1))
+    statuses = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async def request(forwarded_for):
+        scope = {
+            "type": "http",
+            "path": "/api",
+            "client": ("203.0.113.7", 50000),
+            "headers": [(b"x-forwarded-for", forwarded_for.encode("latin-1"))],
+        }
+        await AdmissionControlMiddleware(app, controller)(scope, None, send)
+
+    async def run():
+        await request("198.51.100.1")
+        await request("198.51.100.2")
+
+    asyncio.run(run())
+    assert statuses == [200, 429]
@@ -0,0 +1,162 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from anthropic.types import Message
+
+from agent.app import MedicalAssistantLLM
+from agent.services import MedicalService
+from backend.app.services import doctolib
+
+PROMPT_PATH = str(Path(__file__).resolve().parents[3] / "agent" / "prompt.yaml")
+
+
+def make_message(*content, stop_reason="end_turn"):
+    return Message.model_validate({
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "test",
+        "content": list(content),
+        "stop_reason": stop_reason,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    })
+
+
+def text(value):
+    return make_message({"type": "text", "text": value})
+
+
+def tool_use(tool_id, name, **tool_input):
+    return make_message(
+        {"type": "tool_use", "id": tool_id, "name": name, "input": tool_input},
+        stop_reason="tool_use",
+    )
+
+
+class FakeStream:
+    def __init__(self, message):
+        self._message = message
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        yield SimpleNamespace(type="content_block_start")
+
+    async def get_final_message(self):
+        return self._message
+
+
+class FakeMessages:
+    """Answers with the scripted responses in order, repeating the last one."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def stream(self, messages, **kwargs):
+        self.requests.append(list(messages))
+        index = min(len(self.requests), len(self.responses)) - 1
+        return FakeStream(self.responses[index])
+
+
+class FakePriaid:
+    def __init__(self, specialisations):
+        self.specialisations = specialisations
+
+    def get_symptoms(self, language="en-gb"):
+        return []
+
+    def get_specialisations(self, symptoms, gender, year_of_birth, **kwargs):
+        return self.specialisations
+
+
+@pytest.fixture
+def doctor_calls(monkeypatch):
+    calls = []
+
+    def get_doctors(specialty):
+        calls.append(specialty)
+        return [{"id": f"{specialty}-1", "name": f"Dr {specialty}"}]
+
+    monkeypatch.setattr(doctolib, "get_doctors", get_doctors)
+    return calls
+
+
+def make_assistant(responses, specialisations=(), **kwargs):
+    messages = FakeMessages(responses)
+    assistant = MedicalAssistantLLM(
+        anthropic_api_key="test",
+        prompt_path=PROMPT_PATH,
+        client=SimpleNamespace(messages=messages),
+        service=MedicalService(priaid=FakePriaid(list(specialisations))),
+        **kwargs,
+    )
+    return assistant, messages
+
+
+def test_tool_results_are_sent_back_until_the_model_answers(doctor_calls):
+    assistant, messages = make_assistant([
+        tool_use("toolu_1", "get_doctors", specialty="ORL"),
+        text("Dr ORL can see you."),
+    ])
+
+    response = asyncio.run(assistant.process_message("I need an ENT", raise_errors=True))
+
+    assert response == "Dr ORL can see you."
+    assert len(messages.requests) == 2
+    tool_result = messages.requests[1][-1]["content"][0]
+    assert tool_result["tool_use_id"] == "toolu_1"
+    assert "Dr ORL" in tool_result["content"]
+    assert not tool_result["is_error"]
+    assert [message["role"] for message in assistant.get_conversation_history()] == [
+        "user", "assistant", "user", "assistant"
+    ]
+
+
+def test_turn_stops_at_max_tool_steps_with_a_valid_history(doctor_calls):
+    assistant, messages = make_assistant(
+        [tool_use("toolu_1", "get_doctors", specialty="ORL"), text("Hello again.")],
+        max_tool_steps=1,
+    )
+
+    response = asyncio.run(assistant.process_message("I need an ENT", raise_errors=True))
+
+    assert response == "I could not complete this request within the allowed number of steps."
+    assert len(messages.requests) == 1
+    history = assistant.get_conversation_history()
+    assert [message["role"] for message in history] == ["user", "assistant", "user", "assistant"]
+    assert history[2]["content"][0]["tool_use_id"] == "toolu_1"
+
+    # The next message continues from the answered tool results.
+    assert asyncio.run(assistant.process_message("Hello", raise_errors=True)) == "Hello again."
+    assert messages.requests[1][-2:] == history[-1:] + [{"role": "user", "content": "Hello"}]
+
+
+def test_prefetched_doctors_are_served_from_the_buffer(doctor_calls):
+    assistant, _ = make_assistant(
+        [
+            tool_use("toolu_1", "get_specializations", symptom_ids=[10], age=30, gender="male"),
+            tool_use("toolu_2", "get_doctors", specialty="ORL"),
+            tool_use("toolu_3", "get_doctors", specialty="Pneumologue"),
+            text("Done."),
+        ],
+        specialisations=[
+            {"Name": "Pulmonology", "Accuracy": 40},
+            {"Name": "Otolaryngology", "Accuracy": 90},
+        ],
+        prefetch_top_specialisations=1,
+    )
+
+    asyncio.run(assistant.process_message("My ears hurt", raise_errors=True))
+
+    stats = assistant.get_prefetch_stats()
+    # Only the top-ranked specialty was prefetched; the other call ran the tool.
+    assert (stats["scheduled"], stats["hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert doctor_calls == ["ORL", "Pneumologue"]
@@ -0,0 +1,191 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from anthropic.types import Message
+
+from agent.batch import (
+    BatchCheckpoint,
+    ResultWriter,
+    iter_cases,
+    load_completed,
+    run_agent_cases,
+    run_batch_cases,
+)
+
+
+def make_message(text):
+    return Message.model_validate({
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "test",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    })
+
+
+class FakeStream:
+    def __init__(self, message):
+        self._message = message
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        yield SimpleNamespace(type="content_block_start")
+
+    async def get_final_message(self):
+        return self._message
+
+
+class FakeMessages:
+    """Answers "reply to <message>", failing for the messages in ``failing``."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.seen = []
+
+    def stream(self, messages, **kwargs):
+        text = messages[-1]["content"]
+        self.seen.append(text)
+        if text in self.failing:
+            raise RuntimeError("overloaded")
+        return FakeStream(make_message(f"reply to {text}"))
+
+
+class FakeBatches:
+    def __init__(self):
+        self.created = []
+        self.results_by_batch = {}
+
+    async def create(self, requests):
+        batch_id = f"batch-{len(self.created)}"
+        self.created.append(requests)
+        self.results_by_batch[batch_id] = [
+            SimpleNamespace(
+                custom_id=request["custom_id"],
+                result=SimpleNamespace(
+                    type="succeeded",
+                    message=make_message(f"batched {request['params']['messages'][0]['content']}"),
+                ),
+            )
+            for request in requests
+        ]
+        return SimpleNamespace(id=batch_id)
+
+    async def retrieve(self, batch_id):
+        return SimpleNamespace(processing_status="ended")
+
+    async def results(self, batch_id):
+        async def items():
+            for item in self.results_by_batch[batch_id]:
+                yield item
+        return items()
+
+
+def write_cases(path, messages):
+    with open(path, "w", encoding="utf-8") as file:
+        for index, message in enumerate(messages, start=1):
+            file.write(json.dumps({"id": f"case-{index}", "message": message}) + "\n")
+
+
+def read_results(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def run_agent(cases_path, output_path, messages):
+    writer = ResultWriter(str(output_path))
+    try:
+        asyncio.run(run_agent_cases(
+            iter_cases(str(cases_path), writer.completed),
+            writer,
+            SimpleNamespace(messages=messages),
+            service=object(),
+            concurrency=2,
+        ))
+    finally:
+        writer.close()
+    return writer
+
+
+def test_resume_skips_answered_cases_and_reruns_a_truncated_line(tmp_path):
+    cases, output = tmp_path / "cases.jsonl", tmp_path / "results.jsonl"
+    write_cases(cases, ["cough", "fever", "headache"])
+    output.write_text(
+        json.dumps({"id": "case-1", "response": "reply to cough"}) + "\n" + '{"id": "case-2", "resp'
+    )
+
+    assert load_completed(str(output)) == {"case-1"}
+
+    messages = FakeMessages()
+    writer = run_agent(cases, output, messages)
+
+    assert sorted(messages.seen) == ["fever", "headache"]
+    assert writer.written == 2
+    assert load_completed(str(output)) == {"case-1", "case-2", "case-3"}
+
+
+def test_failed_case_is_written_as_error_and_retried(tmp_path):
+    cases, output = tmp_path / "cases.jsonl", tmp_path / "results.jsonl"
+    write_cases(cases, ["cough", "fever"])
+
+    writer = run_agent(cases, output, FakeMessages(failing={"fever"}))
+
+    assert (writer.written, writer.failed) == (1, 1)
+    failed = [result for result in read_results(output) if result["id"] == "case-2"]
+    assert "response" not in failed[0]
+    assert failed[0]["error"] == "RuntimeError: overloaded"
+    assert load_completed(str(output)) == {"case-1"}
+
+    messages = FakeMessages()
+    writer = run_agent(cases, output, messages)
+
+    assert messages.seen == ["fever"]
+    assert (writer.written, writer.failed) == (1, 0)
+    assert load_completed(str(output)) == {"case-1", "case-2"}
+    assert read_results(output)[-1]["response"] == "reply to fever"
+
+
+def test_batch_resume_collects_checkpointed_batches_instead_of_resubmitting(tmp_path):
+    cases, output = tmp_path / "cases.jsonl", tmp_path / "results.jsonl"
+    write_cases(cases, ["cough", "fever", "headache"])
+    checkpoint_path = tmp_path / "results.jsonl.checkpoint.json"
+
+    batches = FakeBatches()
+    client = SimpleNamespace(messages=SimpleNamespace(batches=batches))
+    # A previous run submitted the first two cases, then crashed.
+    previous = asyncio.run(batches.create([
+        {"custom_id": "0-case-1", "params": {"messages": [{"content": "cough"}]}},
+        {"custom_id": "1-case-2", "params": {"messages": [{"content": "fever"}]}},
+    ]))
+    BatchCheckpoint(str(checkpoint_path)).add(previous.id, {"0-case-1": "case-1", "1-case-2": "case-2"})
+
+    checkpoint = BatchCheckpoint(str(checkpoint_path))
+    writer = ResultWriter(str(output))
+    try:
+        asyncio.run(run_batch_cases(
+            iter_cases(str(cases), writer.completed),
+            writer,
+            client,
+            checkpoint,
+            model="test",
+            system_prompt="",
+            poll_interval=0,
+        ))
+    finally:
+        writer.close()
+
+    # Only the case outside the checkpoint was submitted again.
+    assert [request["custom_id"] for request in batches.created[-1]] == ["0-case-3"]
+    assert {result["id"]: result["response"] for result in read_results(output)} == {
+        "case-1": "batched cough",
+        "case-2": "batched fever",
+        "case-3": "batched headache",
+    }
+    assert BatchCheckpoint(str(checkpoint_path)).batches == []
@@ -0,0 +1,26 @@
+from backend.app.services.catalogue import build_catalogue
+from backend.app.services.doctor_store import DoctorStore, doctor_id, doctor_key
+
+REAUMUR = "https://www.doctolib.fr/centre-medical-et-dentaire/paris/centre-medical-reaumur-cpam-paris"
+
+
+def test_listing_urls_differing_in_tracking_parameters_share_a_key():
+    first = {"url": f"{REAUMUR}?highlight%5Bspeciality_ids%5D%5B%5D=4&pid=practice-25062"}
+    second = {"url": f"{REAUMUR}?highlight%5Bspeciality_ids%5D%5B%5D=7&pid=practice-25062"}
+
+    assert doctor_key(first) == doctor_key(second) == f"{REAUMUR}?pid=practice-25062"
+    assert doctor_id(first) == doctor_id(second)
+
+
+def test_other_practices_keep_distinct_keys():
+    assert doctor_key({"url": f"{REAUMUR}?pid=practice-1"}) != doctor_key({"url": f"{REAUMUR}?pid=practice-2"})
+    assert doctor_key({"url": f"{REAUMUR}/"}) == doctor_key({"url": REAUMUR})
+
+
+def test_bundled_catalogue_stores_the_duplicated_practice_once(tmp_path):
+    catalogue = build_catalogue(store=DoctorStore(tmp_path / "missing.sqlite3"))
+
+    reaumur = [key for key, doctor in catalogue.doctors.items() if doctor["url"].startswith(REAUMUR)]
+    assert len(reaumur) == 1
+    assert catalogue.index["Centre médical et dentaire"].count(reaumur[0]) == 1
+    assert len(catalogue.doctors) == 191
@@ -0,0 +1,79 @@
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services.geo import (
+    EARTH_RADIUS_KM,
+    SpatialIndex,
+    import_centroids,
+    load_centroids,
+    resolve_location,
+)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def test_kd_tree_matches_brute_force():
+    rng = random.Random(7)
+    by_postcode = {}
+    doctors = {}
+    for i in range(300):
+        postcode = f"{10000 + i:05d}"
+        lat, lon = rng.uniform(41.3, 51.1), rng.uniform(-5.2, 9.6)
+        by_postcode[postcode] = SimpleNamespace(postcode=postcode, lat=lat, lon=lon)
+        doctors[f"doctor-{i}"] = {"contact_info": f"1 rue de la Paix, {postcode}"}
+    catalogue = SimpleNamespace(
+        doctors=doctors,
+        index={"ORL": tuple(doctors)[:200], "Dermatologue": tuple(doctors)[200:]},
+    )
+    index = SpatialIndex(catalogue, by_postcode, {})
+
+    for _ in range(50):
+        lat, lon = rng.uniform(41.3, 51.1), rng.uniform(-5.2, 9.6)
+        for specialty, ids in catalogue.index.items():
+            expected = sorted(
+                (haversine_km(lat, lon, index.locations[key].lat, index.locations[key].lon), key)
+                for key in ids
+            )[:7]
+            found = index.nearest(specialty, lat, lon, 7)
+            assert [key for _, key in found] == [key for _, key in expected]
+            for (distance, _), (brute, _) in zip(found, expected):
+                assert math.isclose(distance, brute, abs_tol=1e-6)
+
+    assert index.nearest("Unknown", 48.85, 2.35, 3) == []
+    assert len(index.nearest("Dermatologue", 48.85, 2.35, 500)) == 100
+
+
+def test_import_keeps_curated_rows_and_averages_shared_postcodes(tmp_path):
+    table = tmp_path / "postcode_centroids.csv"
+    table.write_text("postcode,slug,name,lat,lon\n75011,paris-11,Paris 11e,48.8591,2.3800\n")
+    dump = tmp_path / "FR.txt"
+    dump.write_text("\n".join([
+        "FR\t75011\tParis 11 Popincourt\tÎle-de-France\t11\tParis\t75\tParis\t751\t48.8574\t2.3795\t5",
+        "FR\t01000\tBourg-en-Bresse\tAuvergne-Rhône-Alpes\t84\tAin\t01\t\t\t46.2051\t5.2255\t5",
+        "FR\t01000\tSaint-Denis-lès-Bourg\tAuvergne-Rhône-Alpes\t84\tAin\t01\t\t\t46.2022\t5.1892\t5",
+        "FR\t01000\tBourg-en-Bresse\tAuvergne-Rhône-Alpes\t84\tAin\t01\t\t\t46.2051\t5.2255\t5",
+    ]) + "\n")
+
+    assert import_centroids(dump, table) == (1, 2)
+
+    by_postcode, by_slug = load_centroids(table)
+    assert by_postcode["75011"].name == "Paris 11e"
+    assert by_slug["saint-denis-les-bourg"].lat == 46.2022
+    assert math.isclose(by_postcode["01000"].lat, (46.2051 + 46.2022) / 2)
+    assert by_postcode["01000"].name == "Bourg-en-Bresse"
+
+
+def test_unknown_postcode_is_rejected_rather_than_guessed():
+    assert resolve_location("75011") == (48.8591, 2.38)
+    with pytest.raises(ValueError, match="Unknown postcode: 75999"):
+        resolve_location("75999")
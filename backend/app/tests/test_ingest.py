@@ -0,0 +1,110 @@
+import io
+import json
+
+import pytest
+
+from backend.app.services.catalogue import build_catalogue, refresh_catalogue
+from backend.app.services.doctor_store import DoctorStore
+from backend.app.services.ingest import _StreamReader, ingest, iter_grouped_json
+
+
+def doctor(name, url, **extra):
+    return {"nom": name, "url": url, "phones": [], **extra}
+
+
+GROUPED = {
+    "ORL": [
+        doctor('Dr "Quote" \\ Backslash', "https://www.doctolib.fr/orl/paris/a", tarif="25.5 €"),
+        doctor("Dr Émile — Unicode", "https://www.doctolib.fr/orl/paris/b", phones=["01 23"]),
+    ],
+    "Pédiatre": [],
+    "Pneumologue": [doctor("Dr Nested", "https://www.doctolib.fr/pneumologue/lyon/c", extra={"a": [1, 2.5e3]})],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+def test_grouped_json_survives_every_chunk_boundary(chunk_size):
+    text = json.dumps(GROUPED, ensure_ascii=False, indent=1)
+    escaped = json.dumps(GROUPED)  # \uXXXX escapes split across chunks too
+
+    for source in (text, escaped):
+        reader_chunks = iter_grouped_json(_ChunkedFile(source, chunk_size))
+        assert list(reader_chunks) == [
+            (specialty, record) for specialty, records in GROUPED.items() for record in records
+        ]
+
+
+def test_number_at_a_chunk_boundary_is_read_whole():
+    reader = _StreamReader(io.StringIO("12345 "), chunk_size=2)
+    assert reader.value() == 12345
+
+
+class _ChunkedFile(io.StringIO):
+    def __init__(self, text, chunk_size):
+        super().__init__(text)
+        self.chunk_size = chunk_size
+
+    def read(self, size=-1):
+        return super().read(self.chunk_size)
+
+
+@pytest.mark.parametrize("text", [
+    '{"ORL": [{"nom": "Dr A"}',
+    '{"ORL" [{"nom": "Dr A"}]}',
+    '{"ORL": [{"nom": "Dr A"} {"nom": "Dr B"}]}',
+    '{"ORL": [{"nom": "Dr A}]}',
+    '[]',
+])
+def test_malformed_grouped_json_writes_nothing(tmp_path, text):
+    store = DoctorStore(tmp_path / "doctors.sqlite3")
+
+    with pytest.raises(ValueError):
+        ingest(io.StringIO(text), "json", store, batch_size=1)
+
+    ingest(io.StringIO("{}"), "json", store)
+    assert list(store.iter_partition("ORL")) == []
+
+
+def test_bad_records_are_skipped(tmp_path, caplog):
+    store = DoctorStore(tmp_path / "doctors.sqlite3")
+    grouped = '{"ORL": [42, {"nom": "Dr A", "url": "u1"}, "text", null]}'
+    ndjson = "\n".join([
+        json.dumps({"specialite": "ORL", "nom": "Dr B", "url": "u2"}),
+        "{not json",
+        "[1, 2]",
+        json.dumps({"nom": "Dr C"}),
+    ])
+
+    with caplog.at_level("WARNING"):
+        assert ingest(io.StringIO(grouped), "json", store)[0] == 1
+        assert ingest(io.StringIO(ndjson), "ndjson", store)[0] == 1
+
+    assert [record["name"] for record in store.iter_partition("ORL")] == ["Dr A", "Dr B"]
+    assert caplog.text.count("Skipping") == 6
+
+
+def test_partition_refresh_updates_and_removes_doctors(tmp_path):
+    store = DoctorStore(tmp_path / "doctors.sqlite3")
+    ingest(io.StringIO(json.dumps(GROUPED)), "json", store)
+    catalogue = build_catalogue(store=store)
+    pneumologue = catalogue.index["Pneumologue"]
+
+    update = {"ORL": [doctor("Dr A, moved", "https://www.doctolib.fr/orl/paris/a")]}
+    ingest(io.StringIO(json.dumps(update)), "json", store, replace=True)
+    refreshed = refresh_catalogue(catalogue, store)
+
+    names = [refreshed.doctors[key]["name"] for key in refreshed.index["ORL"]]
+    assert names == ["Dr A, moved"]
+    assert len(refreshed.doctors) == 2
+    # Partitions the ingestion did not touch are shared with the previous snapshot.
+    assert refreshed.index["Pneumologue"] is pneumologue
+    assert refreshed.doctors[pneumologue[0]] is catalogue.doctors[pneumologue[0]]
+
+
+def test_ingest_without_replace_keeps_unlisted_doctors(tmp_path):
+    store = DoctorStore(tmp_path / "doctors.sqlite3")
+    ingest(io.StringIO(json.dumps(GROUPED)), "json", store)
+
+    ingest(io.StringIO(json.dumps({"ORL": [doctor("Dr New", "https://www.doctolib.fr/orl/paris/d")]})), "json", store)
+
+    assert len(list(store.iter_partition("ORL"))) == 3
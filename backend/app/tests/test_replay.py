@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from agent import replay as replay_module
+from agent.replay import RecordingPriaid, ReplayDiverged, new_cassette, replay
+
+
+def model_call(content, stop_reason="end_turn"):
+    return {
+        "response": {
+            "id": "msg_test",
+            "type": "message",
+            "role": "assistant",
+            "model": "test",
+            "content": content,
+            "stop_reason": stop_reason,
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        },
+        "latency": 0.0,
+        "ttft": 0.0,
+    }
+
+
+TEXT = [{"type": "text", "text": "See a doctor."}]
+TOOL_USE = [{
+    "type": "tool_use",
+    "id": "toolu_1",
+    "name": "get_specializations",
+    "input": {"symptom_ids": [10], "age": 30, "gender": "male"},
+}]
+
+
+def write_cassette(tmp_path, model_calls, priaid_calls=()):
+    cassette = new_cassette([["I have a stomach ache"]])
+    cassette["model_calls"] = list(model_calls)
+    cassette["priaid_calls"] = list(priaid_calls)
+    path = tmp_path / "cassette.json"
+    path.write_text(json.dumps(cassette))
+    return str(path)
+
+
+def test_replay_of_a_complete_cassette(tmp_path, capsys):
+    asyncio.run(replay(write_cassette(tmp_path, [model_call(TEXT)])))
+
+    assert "agent.process_message" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("model_calls", [
+    [],  # the model is called once more than recorded
+    [model_call(TEXT), model_call(TEXT)],  # the agent stopped early
+    [model_call(TOOL_USE, "tool_use"), model_call(TEXT)],  # unrecorded Priaid call
+])
+def test_diverged_replay_fails(tmp_path, capsys, model_calls):
+    with pytest.raises(ReplayDiverged):
+        asyncio.run(replay(write_cassette(tmp_path, model_calls)))
+
+    assert "agent.process_message" not in capsys.readouterr().out
+
+
+def test_recording_bypasses_the_shared_cache(monkeypatch):
+    def cached(*args, **kwargs):
+        raise AssertionError("recorded through the shared cache")
+
+    monkeypatch.setattr(replay_module.medical_api, "get_specialisations", cached)
+    monkeypatch.setattr(replay_module.medical_api, "fetch_specialisations",
+                        lambda *args, **kwargs: [{"ID": 1, "Name": "Gastroenterology", "Accuracy": 90}])
+    cassette = new_cassette([])
+
+    RecordingPriaid(cassette).get_specialisations([10], "male", 1990)
+
+    assert cassette["priaid_calls"][0]["result"][0]["Name"] == "Gastroenterology"
@@ -0,0 +1,55 @@
+import os
+import stat
+
+from backend.app.core.shared_cache import SharedCache
+
+
+def test_cache_file_is_private(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache" / "shared.sqlite3"))
+    cache.set("priaid:token", {"Token": "secret"}, ttl=60)
+
+    assert cache.get("priaid:token") == {"Token": "secret"}
+    assert stat.S_IMODE(os.stat(cache.path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(tmp_path / "cache").st_mode) == 0o700
+
+
+def test_existing_file_is_restricted(tmp_path):
+    path = tmp_path / "shared.sqlite3"
+    path.touch(mode=0o666)
+    os.chmod(path, 0o666)
+
+    SharedCache(str(path)).set("key", 1, ttl=60)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_expired_entries_are_not_returned(tmp_path):
+    cache = SharedCache(str(tmp_path / "shared.sqlite3"))
+    cache.set("key", "value", ttl=-1)
+
+    assert cache.get("key") is None
+    assert cache.purge_expired() == 1
+
+
+def test_writes_purge_expired_entries_periodically(tmp_path, monkeypatch):
+    cache = SharedCache(str(tmp_path / "shared.sqlite3"))
+    cache.set("old", "value", ttl=-1)
+    cache.set("new", "value", ttl=60)
+    assert cache.purge_expired() == 1
+
+    cache.set("old", "value", ttl=-1)
+    monkeypatch.setattr("backend.app.core.shared_cache.time.time", lambda: cache._next_purge)
+    cache.set("newer", "value", ttl=60)
+
+    assert cache.purge_expired() == 0
+
+
+def test_scan_returns_unexpired_entries_with_the_prefix(tmp_path):
+    cache = SharedCache(str(tmp_path / "shared.sqlite3"))
+    cache.set("usage:a", 1, ttl=60)
+    cache.set("usage:b", 2, ttl=60)
+    cache.set("usage:c", 3, ttl=-1)
+    cache.set("usage;", 4, ttl=60)
+    cache.set("other", 5, ttl=60)
+
+    assert sorted(cache.scan("usage:")) == [("usage:a", 1), ("usage:b", 2)]
@@ -0,0 +1,42 @@
+import pytest
+
+from backend.app.services.symptom_extractor import extract_symptoms
+
+
+def names(text):
+    return [result["Name"] for result in extract_symptoms(text)]
+
+
+def test_docstring_example():
+    assert names("j'ai mal au ventre et je suis très agité") == ["Abdominal pain", "Agitation"]
+
+
+@pytest.mark.parametrize("text", [
+    "I don't have a fever",
+    "I have no chest pain",
+    "pas de douleur thoracique",
+    "sans fièvre",
+    "je n'ai pas de fièvre",
+    "no fever or cough",
+])
+def test_negated_symptoms_are_left_out(text):
+    assert names(text) == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("no fever but a cough", ["Cough"]),
+    ("I have a fever and no cough", ["Fever"]),
+    ("j'ai de la fièvre mais pas de toux", ["Fever"]),
+    ("I don't have a headache, but I feel dizzy", ["Dizziness"]),
+])
+def test_negation_ends_with_its_clause(text, expected):
+    assert names(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I'm not hungry", ["Reduced appetite"]),
+    ("je n'ai pas faim", ["Reduced appetite"]),
+    ("I can't sleep", ["Sleeplessness"]),
+])
+def test_negative_phrasings_of_a_symptom_still_match(text, expected):
+    assert names(text) == expected
@@ -0,0 +1,39 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.app.services.symptom_extractor import extract_symptoms
+from backend.app.services.symptom_snapshots import available_languages, load_snapshots
+from backend.app.services.triage import triage
+
+
+def write(path, symptoms):
+    path.write_text(json.dumps(symptoms), encoding="utf-8")
+
+
+def test_imported_snapshot_replaces_the_fallback(tmp_path):
+    write(tmp_path / "symptoms.json", [{"ID": 11, "Name": "Fever"}])
+    write(tmp_path / "symptoms.fr-fr.fallback.json", [{"ID": 11, "Name": "Fièvre (traduction)"}])
+
+    assert available_languages(tmp_path) == ("en-gb", "fr-fr")
+    assert load_snapshots(tmp_path).name(11, "fr-fr") == "Fièvre (traduction)"
+
+    write(tmp_path / "symptoms.fr-fr.json", [{"ID": 11, "Name": "Fièvre"}])
+
+    assert available_languages(tmp_path) == ("en-gb", "fr-fr")
+    assert load_snapshots(tmp_path).name(11, "fr-fr") == "Fièvre"
+
+
+def test_triage_rejects_a_language_without_snapshot():
+    def fetch_specialisations(*args, **kwargs):
+        raise AssertionError("Priaid must not be called")
+
+    with pytest.raises(ValueError, match="Unsupported language: de-de"):
+        asyncio.run(triage(["Fever"], 30, "male", language="de-de", fetch_specialisations=fetch_specialisations))
+
+
+def test_extract_symptoms_rejects_a_language_without_snapshot():
+    with pytest.raises(ValueError, match="Unsupported language"):
+        extract_symptoms("fever", language="xx-xx")
+    assert extract_symptoms("fever", language="fr-fr")[0]["Name"] == "Fièvre"
@@ -0,0 +1,152 @@
+import asyncio
+import gc
+import threading
+import time
+from typing import Dict, List
+
+import pytest
+
+from agent.tools import Tool
+
+
+@pytest.fixture(autouse=True)
+def restore_registry():
+    registry = list(Tool._registry)
+    yield
+    Tool._registry[:] = registry
+
+
+def make_service():
+    class Service:
+        def __init__(self):
+            self.calls = 0
+
+        @Tool(name="lookup", description="Test tool", cache_ttl=60)
+        async def lookup(self, specialty: str) -> List[Dict]:
+            """
+            :param specialty: Specialty name
+            """
+            self.calls += 1
+            return [{"name": "Dr A", "specialty": specialty}]
+
+    return Service
+
+
+def tool_of(service) -> Tool:
+    return type(service).lookup.__tool__
+
+
+def test_cache_hits_return_independent_copies():
+    service = make_service()()
+
+    async def run():
+        first = await service.lookup("ORL")
+        first.clear()
+        second = await service.lookup("ORL")
+        second[0]["name"] = "changed"
+        return await service.lookup("ORL")
+
+    assert asyncio.run(run()) == [{"name": "Dr A", "specialty": "ORL"}]
+    assert service.calls == 1
+    assert tool_of(service).stats["cache_hits"] == 2
+
+
+def test_cache_is_per_instance_and_does_not_keep_it_alive():
+    Service = make_service()
+    first, second = Service(), Service()
+
+    async def run():
+        await first.lookup("ORL")
+        await second.lookup("ORL")
+
+    asyncio.run(run())
+    assert (first.calls, second.calls) == (1, 1)
+
+    tool = tool_of(first)
+    assert len(tool._instance_caches) == 2
+    del first, second
+    gc.collect()
+    assert len(tool._instance_caches) == 0
+
+
+def test_schema_skips_self():
+    tool = tool_of(make_service()())
+    assert tool.schema["input_schema"]["required"] == ["specialty"]
+
+
+def make_limited(max_concurrency=None, timeout=None, delay=0.05, in_thread=False):
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def enter():
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+
+    def leave():
+        with lock:
+            state["running"] -= 1
+
+    def blocking():
+        enter()
+        time.sleep(delay)
+        leave()
+
+    @Tool(name="slow", description="Test tool", timeout=timeout, max_concurrency=max_concurrency)
+    async def slow(index: int) -> int:
+        """
+        :param index: Call number
+        """
+        if in_thread:
+            await asyncio.to_thread(blocking)
+        else:
+            enter()
+            await asyncio.sleep(delay)
+            leave()
+        return index
+
+    return slow, state
+
+
+def test_timeout_raises_and_is_counted():
+    slow, _ = make_limited(timeout=0.01, delay=1)
+
+    with pytest.raises(TimeoutError, match="Tool slow timed out after 0.01s"):
+        asyncio.run(slow(1))
+    assert slow.__tool__.stats["timeouts"] == 1
+
+
+def test_max_concurrency_limits_concurrent_calls():
+    slow, state = make_limited(max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*[slow(index) for index in range(6)])
+
+    assert asyncio.run(run()) == list(range(6))
+    assert state["peak"] == 2
+
+
+def test_concurrency_limit_works_across_event_loops():
+    slow, state = make_limited(max_concurrency=1)
+
+    async def run():
+        return await asyncio.gather(slow(1), slow(2))
+
+    # A semaphore bound to the first loop used to fail in the second one.
+    assert asyncio.run(run()) == [1, 2]
+    assert asyncio.run(run()) == [1, 2]
+    assert state["peak"] == 1
+
+
+def test_timed_out_thread_keeps_its_slot():
+    slow, state = make_limited(max_concurrency=1, timeout=0.02, delay=0.2, in_thread=True)
+
+    async def run():
+        results = await asyncio.gather(slow(1), slow(2), return_exceptions=True)
+        # Let the orphaned thread finish before the loop closes.
+        await asyncio.sleep(0.3)
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert state["peak"] == 1
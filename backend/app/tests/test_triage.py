@@ -0,0 +1,18 @@
+import asyncio
+
+from backend.app.services.triage import triage
+
+
+def fake_specialisations(symptoms, gender, year_of_birth, language="en-gb"):
+    # Priaid names specialisations in the requested language.
+    name = {"en-gb": "Otolaryngology", "fr-fr": "Oto-rhino-laryngologie"}[language]
+    return [{"ID": 1, "Name": name, "Accuracy": 90}]
+
+
+def test_french_triage_maps_to_a_doctolib_specialty():
+    result = asyncio.run(triage(["Mal de gorge"], 30, "female", language="fr-fr",
+                                fetch_specialisations=fake_specialisations))
+
+    assert result["symptoms"][0]["Name"] == "Mal de gorge"
+    assert list(result["doctors"]) == ["ORL"]
+    assert result["doctors"]["ORL"]
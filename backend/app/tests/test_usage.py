@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from backend.app.core.shared_cache import SharedCache
+from backend.app.core.usage import UsageTracker
+
+
+def record_turn(tracker, session_id, input_tokens, ttft=0.5):
+    turn = tracker.start_turn(session_id)
+    tracker.record_call(
+        turn,
+        SimpleNamespace(input_tokens=input_tokens, output_tokens=10, cache_read_input_tokens=0),
+        "system prompt",
+        [],
+        [{"role": "user", "content": "I have a fever"}],
+        latency=1.0,
+        ttft=ttft,
+    )
+    tracker.finish_turn(session_id, turn)
+
+
+def test_usage_recorded_by_one_process_is_read_by_another(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    # The agent and the backend each have their own tracker over the same file.
+    agent, backend = UsageTracker(SharedCache(path)), UsageTracker(SharedCache(path))
+
+    record_turn(agent, "session-1", 100)
+    record_turn(agent, "session-1", 200)
+    record_turn(agent, "session-2", 50)
+
+    summary = backend.session_summary("session-1")
+    assert summary["totals"]["calls"] == 2
+    assert summary["totals"]["input_tokens"] == 300
+    assert [turn["input_tokens"] for turn in summary["turns"]] == [100, 200]
+    assert backend.session_summary("unknown") is None
+
+    stats = backend.get_stats()
+    assert stats["input_tokens"] == 350
+    assert stats["sessions"] == 2
+    assert stats["ttft_p50"] == 0.5
+
+
+def test_sessions_keep_their_most_recent_turns(tmp_path):
+    tracker = UsageTracker(SharedCache(str(tmp_path / "cache.sqlite3")), max_turns=2)
+
+    for input_tokens in (1, 2, 3):
+        record_turn(tracker, "session", input_tokens)
+
+    summary = tracker.session_summary("session")
+    assert [turn["input_tokens"] for turn in summary["turns"]] == [2, 3]
+    assert summary["totals"]["input_tokens"] == 6
+
+
+def test_a_failed_write_is_logged_not_raised(tmp_path, caplog):
+    not_a_directory = tmp_path / "file"
+    not_a_directory.write_text("")
+    tracker = UsageTracker(SharedCache(str(not_a_directory / "cache.sqlite3")))
+
+    with caplog.at_level("WARNING"):
+        record_turn(tracker, "session", 100)
+
+    assert "Could not record the usage of session session" in caplog.text
+
+
+def test_stats_add_up_the_rows_of_every_process(tmp_path, monkeypatch):
+    tracker = UsageTracker(SharedCache(str(tmp_path / "cache.sqlite3")))
+
+    record_turn(tracker, "session-1", 100, ttft=0.05)
+    monkeypatch.setattr("os.getpid", lambda: 123456)
+    record_turn(tracker, "session-2", 50, ttft=2.5)
+    record_turn(tracker, "session-2", 50, ttft=2.5)
+
+    assert len(tracker.cache.scan("llm_usage:totals:")) == 2
+    stats = tracker.get_stats()
+    assert (stats["input_tokens"], stats["calls"], stats["sessions"]) == (200, 3, 2)
+    assert stats["ttft_p50"] == 3.0
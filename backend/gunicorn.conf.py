@@ -0,0 +1,25 @@
+# backend/gunicorn.conf.py
+#
+# Multi-worker deployment with catalogues shared copy-on-write:
+#     cd backend && gunicorn app.main:app -c gunicorn.conf.py
+#
+# uvicorn's own --workers flag spawns fresh interpreters, so nothing loaded in
+# its parent is shared; gunicorn forks from a preloaded master instead.
+import multiprocessing
+import os
+
+os.environ.setdefault("PRELOAD_CATALOGUES", "true")
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Proxies trusted to set X-Forwarded-For; per-client quotas key on the client
+# address uvicorn derives from it. Only the local host by default.
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def on_starting(server):
+    from app.core.shared_cache import shared_cache
+
+    shared_cache.purge_expired()
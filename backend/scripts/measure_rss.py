@@ -0,0 +1,94 @@
+"""
+Compare per-worker memory with and without catalogue preloading.
+
+Forks N workers the way a pre-forking server does. In "lazy" mode each worker
+builds its own catalogue (the previous behaviour); in "preload" mode the
+master builds it before forking. Each worker then serves every specialty and
+reports RSS, PSS and private memory from /proc/self/smaps_rollup (Linux only).
+
+    python backend/scripts/measure_rss.py --workers 4
+"""
+import argparse
+import gc
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(BACKEND_DIR), str(BACKEND_DIR.parent)]
+
+from app.services import catalogue  # noqa: E402
+from app.services.doctolib import get_doctors  # noqa: E402
+from app.services.medical_api import get_symptoms  # noqa: E402
+
+
+def read_memory() -> dict:
+    """Return RSS, PSS and private memory of the current process in KiB."""
+    fields = {}
+    with open("/proc/self/smaps_rollup", "r") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def serve_requests(rounds: int) -> None:
+    for _ in range(rounds):
+        get_symptoms()
+        for specialty in catalogue.get_catalogue().specialties:
+            get_doctors(specialty)
+    gc.collect()
+
+
+def run(mode: str, workers: int, rounds: int) -> list:
+    catalogue._catalogue = None
+    if mode == "preload":
+        catalogue.preload_catalogues()
+
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            serve_requests(rounds)
+            memory = read_memory()
+            os.write(write_fd, "{rss} {pss} {private}".format(**memory).encode())
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in pipes:
+        rss, pss, private = (int(value) for value in os.read(read_fd, 128).split())
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        results.append({"rss": rss, "pss": pss, "private": private})
+
+    if mode == "preload":
+        gc.unfreeze()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'worker':>6} {'rss KiB':>9} {'pss KiB':>9} {'private KiB':>12}")
+    for mode in ("lazy", "preload"):
+        results = run(mode, args.workers, args.rounds)
+        for index, memory in enumerate(results):
+            print(f"{mode:<8} {index:>6} {memory['rss']:>9} {memory['pss']:>9} {memory['private']:>12}")
+        mean_private = sum(memory["private"] for memory in results) / len(results)
+        print(f"{mode:<8} {'mean':>6} {'':>9} {'':>9} {mean_private:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()